@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.core.search import get_search
+from app.services.codebase.answer import get_codebase_answer_generator
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Startup warm-up of the search and answer singletons, and its outcome.
+
+    The lifespan starts `warm_up` in the background so the server accepts
+    connections right away; `/api/ready` reports 503 until it finishes. A
+    failed warm-up (say, the model server socket is not up yet) is retried
+    with exponential backoff, so a worker turns ready once the cause clears.
+    """
+
+    _instance: Optional["Readiness"] = None
+
+    def __new__(cls) -> "Readiness":
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.components: Dict[str, float] = {}
+        self.warmup_seconds: Optional[float] = None
+        self._done = asyncio.Event()
+        self._initialized = True
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "disabled")
+
+    async def warm_up(self) -> None:
+        if not settings.warmup_on_startup:
+            self.status = "disabled"
+            self._done.set()
+            return
+
+        delay = settings.warmup_retry_delay
+        attempt = 1
+        while not await self._attempt(attempt):
+            # Requests meanwhile still work: the singletons load on first use
+            logger.info(f"Retrying warm-up in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.warmup_retry_max_delay)
+            attempt += 1
+
+        timings = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.components.items())
+        logger.info(f"Warm-up complete in {self.warmup_seconds:.1f}s ({timings})")
+
+    async def _attempt(self, attempt: int) -> bool:
+        self._done.clear()
+        self.status = "warming_up"
+        started = time.perf_counter()
+        logger.info(f"Warming up search and answer components (attempt {attempt})...")
+        try:
+            search = await asyncio.to_thread(get_search)
+            self.components.update(search.load_seconds)
+
+            component_started = time.perf_counter()
+            await asyncio.to_thread(get_codebase_answer_generator)
+            self.components["answer_generator"] = time.perf_counter() - component_started
+
+            self.components.update(await asyncio.to_thread(search.warm_up))
+            self.status = "ready"
+            self.error = None
+        except Exception as e:
+            self.status = "failed"
+            self.error = f"{type(e).__name__}: {e}"
+            logger.exception(f"Warm-up failed: {e}")
+        finally:
+            self.warmup_seconds = time.perf_counter() - started
+            self._done.set()
+        return self.status == "ready"
+
+    async def wait(self) -> None:
+        """Wait for a warm-up in progress instead of loading the models a second time."""
+        if self.status == "warming_up":
+            await self._done.wait()
+
+    async def report(self) -> Dict[str, Any]:
+        report: Dict[str, Any] = {
+            "ready": self.ready,
+            "status": self.status,
+            "components": {name: round(seconds, 3) for name, seconds in self.components.items()},
+            "warmup_seconds": round(self.warmup_seconds, 3) if self.warmup_seconds is not None else None,
+        }
+        if self.error:
+            report["error"] = self.error
+        if self.status == "ready":
+            search = get_search()
+            report["index_version"] = search.index_version
+            report["documents"] = await asyncio.to_thread(search.document_counts)
+        return report
+
+
+def get_readiness() -> Readiness:
+    return Readiness()
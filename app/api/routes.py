@@ -1,9 +1,12 @@
 import logging
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
+from app.api.readiness import get_readiness
+from app.config import settings
 from app.core.search import get_search
 from app.services.codebase.answer import get_codebase_answer_generator
 from app.services.scenario import get_scenario_generator
@@ -53,9 +56,24 @@ async def codebase_query(request: CodebaseRequest) -> CodebaseResponse:
     try:
         logger.info(f"Codebase request received: question='{request.question[:100]}...' top_k={request.top_k} rerank_top_n={request.rerank_top_n}")
 
+        await get_readiness().wait()
         search = get_search()
         generator = get_codebase_answer_generator()
 
+        question_vector = None
+        # The retrieval sizes change which documents the answer is built from
+        answer_params = (
+            request.top_k if request.top_k is not None else settings.retrieve_top_k,
+            request.rerank_top_n if request.rerank_top_n is not None else settings.rerank_top_n,
+        )
+        if settings.answer_cache_entries > 0:
+            question_vector = await search.embed_question(request.question)
+            cached = generator.answer_cache.lookup(question_vector, search.index_version, answer_params)
+            if cached is not None:
+                cached_question, similarity, result = cached
+                logger.info(f"Answer cache hit ({similarity:.3f}) for question: '{cached_question[:100]}'")
+                return CodebaseResponse(**result)
+
         try:
             documents = await search.search(request.question, top_k=request.top_k, rerank_top_n=request.rerank_top_n)
             if not documents:
@@ -76,6 +94,10 @@ async def codebase_query(request: CodebaseRequest) -> CodebaseResponse:
         try:
             result = await generator.generate(request.question, documents)
             logger.info(f"Successfully generated answer with {len(result['sources'])} sources")
+            if question_vector is not None:
+                generator.answer_cache.put(
+                    request.question, question_vector, result, search.index_version, answer_params
+                )
         except Exception as e:
             logger.error(f"Answer generation failed: {str(e)}")
             raise HTTPException(
@@ -99,6 +121,75 @@ async def codebase_query(request: CodebaseRequest) -> CodebaseResponse:
         ) from e
 
 
+class SearchBatchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=100, description="Queries to search, Korean or English")
+    top_k: Optional[int] = Field(None, ge=1, le=500, description="Number of documents to retrieve before reranking")
+    rerank_top_n: Optional[int] = Field(None, ge=1, le=100, description="Number of documents to keep after reranking")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "queries": ["결제 실패 시 재시도 로직", "How is the login token refreshed?"],
+                "top_k": 50,
+                "rerank_top_n": 10,
+            }
+        }
+
+
+class SearchDocumentResponse(BaseModel):
+    file_path: str = Field(..., description="Source file of the chunk")
+    content: str = Field(..., description="Chunk text")
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Chunk metadata and scores")
+
+
+class SearchResultResponse(BaseModel):
+    query: str = Field(..., description="Query as given in the request")
+    documents: List[SearchDocumentResponse] = Field(default_factory=list, description="Ranked documents, best first")
+    reranked_passages: int = Field(0, description="Candidates the reranker scored; 0 when there were too few to rerank")
+
+
+class SearchBatchResponse(BaseModel):
+    index_version: str = Field(..., description="Index version the results come from")
+    results: List[SearchResultResponse] = Field(default_factory=list, description="One result per query, in request order")
+
+
+@router.post("/search/batch", response_model=SearchBatchResponse, status_code=status.HTTP_200_OK)
+async def search_batch(request: SearchBatchRequest) -> SearchBatchResponse:
+    logger.info(f"Batch search request received: {len(request.queries)} queries top_k={request.top_k} rerank_top_n={request.rerank_top_n}")
+
+    await get_readiness().wait()
+    search = get_search()
+    try:
+        results = await search.search_many(request.queries, top_k=request.top_k, rerank_top_n=request.rerank_top_n)
+    except Exception as e:
+        logger.exception(f"Batch search failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve documents from database.",
+        ) from e
+
+    return SearchBatchResponse(
+        index_version=search.index_version,
+        results=[
+            SearchResultResponse(
+                query=query,
+                documents=[
+                    SearchDocumentResponse(
+                        file_path=doc.metadata.get("file_path", ""),
+                        content=doc.page_content,
+                        metadata=doc.metadata,
+                    )
+                    for doc in documents
+                ],
+                reranked_passages=max(
+                    (doc.metadata.get("reranked_passages", 0) for doc in documents), default=0
+                ),
+            )
+            for query, documents in zip(request.queries, results)
+        ],
+    )
+
+
 class UserScenarioRequest(BaseModel):
     page_id: Optional[str] = Field(None, description="Confluence page ID")
     confluence_url: Optional[str] = Field(None, description="Confluence page URL")
@@ -140,6 +231,7 @@ async def user_scenario(request: UserScenarioRequest) -> UserScenarioResponse:
         page_identifier = request.page_id or request.confluence_url
         logger.info(f"User scenario request: page='{page_identifier}'")
 
+        await get_readiness().wait()
         generator = get_scenario_generator()
 
         try:
@@ -182,3 +274,13 @@ async def user_scenario(request: UserScenarioRequest) -> UserScenarioResponse:
 async def health() -> dict:
     logger.debug("Health check requested")
     return {"status": "ok", "service": "code-bot-api"}
+
+
+@router.get("/ready")
+async def ready() -> ORJSONResponse:
+    readiness = get_readiness()
+    report = await readiness.report()
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK if readiness.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=report,
+    )
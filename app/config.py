@@ -1,6 +1,7 @@
 """Application configuration using Pydantic Settings v2."""
 
 from pathlib import Path
+from typing import List
 
 from pydantic_settings import BaseSettings
 
@@ -32,6 +33,78 @@ class Settings(BaseSettings):
     atlassian_search_url: str = ""
     atlassian_content_url: str = ""
 
+    # torch | onnx | onnx-int8
+    embedding_backend: str = "torch"
+    embedding_onnx_quantization: str = "avx512_vnni"
+    embedding_model_cache_dir: Path = Path("./data/models")
+
+    embedding_cache_path: Path = Path("./data/embedding_cache.sqlite3")
+    embedding_cache_max_entries: int = 200_000
+
+    # Load models and open the index at startup instead of on the first request
+    warmup_on_startup: bool = True
+    # A failed warm-up is retried after this many seconds, doubling up to the max
+    warmup_retry_delay: float = 1.0
+    warmup_retry_max_delay: float = 60.0
+
+    # Unix socket of scripts/model_server.py; empty loads the models in-process
+    model_server_socket: str = ""
+    model_server_timeout: float = 30.0
+    model_server_max_batch: int = 64
+    model_server_max_wait_ms: float = 5.0
+
+    # Cascade reranking: score the first `window` candidates, widen (doubling)
+    # only while deeper candidates could still reach the top N; 0 scores all
+    rerank_cascade_window: int = 0
+    rerank_cascade_confidence: float = 0.95
+    rerank_cascade_margin: float = 0.2
+
+    # Korean -> English query translations: in-process LRU + SQLite, TTL in seconds
+    translation_cache_path: Path = Path("./data/translation_cache.sqlite3")
+    translation_cache_ttl: float = 7 * 24 * 3600
+    translation_cache_memory_entries: int = 1024
+    translation_cache_max_entries: int = 50_000
+
+    # Local translation through scripts/build_glossary.py output when it covers
+    # this share of a question's Korean words; the LLM translates the rest
+    glossary_path: Path = Path("./data/glossary.json")
+    glossary_min_coverage: float = 0.8
+    glossary_expansions: int = 1
+
+    # In-process caches, cleared whenever a new index version is loaded
+    query_embedding_cache_entries: int = 1024
+    search_result_cache_entries: int = 256
+
+    # Answers reused for near-duplicate questions (cosine similarity of question embeddings)
+    answer_cache_entries: int = 512
+    answer_cache_ttl: float = 3600
+    answer_cache_threshold: float = 0.95
+
+    index_keep_versions: int = 2
+    index_reload_interval: float = 5.0
+
+    # Comma-separated collections searched together; empty means collection_name
+    search_collections: str = ""
+    rrf_k: int = 60
+
+    # Exact identifier lookups through the symbol index
+    symbol_search: bool = True
+    symbol_max_hits: int = 10
+    # Skip vector search when a query is little more than resolved identifiers
+    symbol_fast_path_max_words: int = 4
+
+    # BM25 index queried alongside the vector store and fused with RRF
+    hybrid_search: bool = True
+
+    # none | int8 | binary; first-pass scan over quantized vectors, then rescoring
+    vector_quantization: str = "none"
+    quantization_rescore_factor: int = 4
+
+    @property
+    def search_collection_names(self) -> List[str]:
+        names = [name.strip() for name in self.search_collections.split(",") if name.strip()]
+        return names or [self.collection_name]
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,8 +1,22 @@
-from app.core.search import CodebaseSearch, get_search
-from app.core.index import CodebaseIndexer
+from importlib import import_module
 
 __all__ = [
     "CodebaseSearch",
     "get_search",
     "CodebaseIndexer",
 ]
+
+# Resolved on first access: the chunking pool's spawn workers import
+# app.core.chunking, and must not load chromadb, flashrank and langchain
+# through this package just to split files.
+_EXPORTS = {
+    "CodebaseSearch": "app.core.search",
+    "get_search": "app.core.search",
+    "CodebaseIndexer": "app.core.index",
+}
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name]), name)
@@ -0,0 +1,264 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Generic, Hashable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+from app.core.korean import normalize_query
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """Thread-safe in-process LRU cache with an optional time-to-live."""
+
+    def __init__(self, max_entries: int, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: V) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
+
+
+class TranslationCache:
+    """Query translations in an in-process LRU backed by SQLite.
+
+    Keys are the normalized question plus the LLM model, so rephrasing that
+    only differs in spacing, punctuation or particles reuses one translation,
+    and a model change does not serve stale output. Entries expire after
+    `ttl` seconds in both tiers.
+    """
+
+    def __init__(self, path: Path, model_name: str, ttl: float, memory_entries: int, max_entries: int):
+        self.path = path
+        self.model_name = model_name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory = LRUCache[str](memory_entries, ttl=ttl)
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, query TEXT NOT NULL, translation TEXT NOT NULL, "
+            "created_at REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS translations_created_at ON translations(created_at)"
+        )
+        self._conn.commit()
+
+    def key(self, query: str) -> str:
+        payload = f"{self.model_name}\0{normalize_query(query)}".encode("utf-8", errors="ignore")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, query: str) -> Optional[str]:
+        key = self.key(query)
+        translation = self.memory.get(key)
+        if translation is not None:
+            return translation
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translation FROM translations WHERE key = ? AND created_at > ?",
+                (key, time.time() - self.ttl),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE translations SET hits = hits + 1 WHERE key = ?", (key,))
+            self._conn.commit()
+            self.disk_hits += 1
+        self.memory.put(key, row[0])
+        return row[0]
+
+    def put(self, query: str, translation: str) -> None:
+        key = self.key(query)
+        self.memory.put(key, translation)
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (key, query, translation, created_at, hits) "
+                "VALUES (?, ?, ?, ?, 0)",
+                (key, query, translation, time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        self._conn.execute("DELETE FROM translations WHERE created_at <= ?", (time.time() - self.ttl,))
+        count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        if count > self.max_entries:
+            # Oldest first: translations do not change, so age is the only staleness
+            self._conn.execute(
+                "DELETE FROM translations WHERE key IN "
+                "(SELECT key FROM translations ORDER BY created_at LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def entries(self) -> Iterator[Tuple[str, str]]:
+        """(question, translation) pairs that have not expired, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT query, translation FROM translations WHERE created_at > ? ORDER BY created_at DESC",
+                (time.time() - self.ttl,),
+            ).fetchall()
+        yield from rows
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        return {
+            "entries": entries,
+            "memory_entries": len(self.memory),
+            "memory_hits": self.memory.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class _CachedAnswer(NamedTuple):
+    question: str
+    vector: np.ndarray
+    value: Dict[str, Any]
+    index_version: str
+    params: Tuple[Any, ...]
+    created_at: float
+
+
+class SemanticAnswerCache:
+    """Answers reused across questions whose embeddings are nearly identical.
+
+    "비밀번호 변경 팝업 주기?" and "비번 변경 팝업 언제 떠?" land close together in
+    embedding space, so the second is served the first one's answer when their
+    cosine similarity reaches `threshold`. Entries expire after `ttl` seconds
+    and as soon as a lookup sees a different index version. `params` holds
+    whatever else shaped the answer (top_k, rerank_top_n); an entry is only
+    served to a lookup with the same params.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, threshold: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._entries: List[_CachedAnswer] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(vector: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _prune(self, index_version: str) -> None:
+        cutoff = time.time() - self.ttl
+        live = [
+            entry
+            for entry in self._entries
+            if entry.created_at > cutoff and entry.index_version == index_version
+        ]
+        if len(live) != len(self._entries):
+            self._entries = live
+            self._matrix = None
+
+    def lookup(
+        self,
+        vector: Sequence[float],
+        index_version: str,
+        params: Tuple[Any, ...] = (),
+    ) -> Optional[Tuple[str, float, Dict[str, Any]]]:
+        """(cached question, similarity, answer) of the closest question above the threshold."""
+        with self._lock:
+            self._prune(index_version)
+            if not self._entries:
+                self.misses += 1
+                return None
+            if self._matrix is None:
+                self._matrix = np.vstack([entry.vector for entry in self._entries])
+            scores = self._matrix @ self._unit(vector)
+            scores[[entry.params != params for entry in self._entries]] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry = self._entries[best]
+            return entry.question, float(scores[best]), entry.value
+
+    def put(
+        self,
+        question: str,
+        vector: Sequence[float],
+        value: Dict[str, Any],
+        index_version: str,
+        params: Tuple[Any, ...] = (),
+    ) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._prune(index_version)
+            self._entries.append(
+                _CachedAnswer(question, self._unit(vector), value, index_version, tuple(params), time.time())
+            )
+            # Oldest first: an answer is only as fresh as when it was generated
+            del self._entries[: max(len(self._entries) - self.max_entries, 0)]
+            self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
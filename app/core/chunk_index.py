@@ -0,0 +1,88 @@
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkIndex(ABC):
+    """Base for auxiliary indexes kept next to a collection in its version directory.
+
+    The indexer's write stage calls `add` for every upserted chunk and `remove`
+    for every deleted chunk id, so subclasses stay in sync with Chroma without
+    a separate pass. State is saved as one JSON document.
+    """
+
+    VERSION = 1
+    NAME = ""
+
+    def __init__(self, path: Path):
+        self.path = path
+        # Saved by another VERSION: must be rebuilt before it can be used
+        self.stale = False
+
+    @classmethod
+    def path_for(cls, persist_dir: Path, collection_name: str) -> Path:
+        return persist_dir / f"{collection_name}.{cls.NAME}.json"
+
+    @classmethod
+    def load(cls, path: Path) -> "ChunkIndex":
+        index = cls(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return index
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {cls.NAME} index {path}: {e}")
+            return index
+        if data.get("version") == cls.VERSION:
+            index._restore(data)
+        else:
+            index.stale = True
+        return index
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def save(self) -> None:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, **self._dump()}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def rebuild(self, collection, batch_size: int = 5000) -> int:
+        """Fill the index from every chunk already stored in a Chroma collection."""
+        count = 0
+        offset = 0
+        while True:
+            page = collection.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+            if not page["ids"]:
+                break
+            self.add(page["ids"], page["documents"], [meta or {} for meta in page["metadatas"]])
+            count += len(page["ids"])
+            offset += len(page["ids"])
+        return count
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def _restore(self, data: Dict) -> None:
+        ...
+
+    @abstractmethod
+    def _dump(self) -> Dict:
+        ...
+
+    @abstractmethod
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict]) -> None:
+        ...
+
+    @abstractmethod
+    def remove(self, ids: Iterable[str]) -> None:
+        ...
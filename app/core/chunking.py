@@ -0,0 +1,265 @@
+import logging
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from langchain.text_splitter import Language, RecursiveCharacterTextSplitter
+
+from app.core.declarations import DeclarationChunker
+from app.core.manifest import hash_content
+
+logger = logging.getLogger(__name__)
+
+
+CHUNK_STRATEGIES = ("declaration", "recursive")
+
+INDEXABLE_EXTENSIONS = {
+    ".kt": ("kotlin", "kotlin"),
+    ".kts": ("kotlin", "kotlin"),
+    ".java": ("java", "java"),
+    ".gradle": ("gradle", "groovy"),
+    ".md": ("markdown", "markdown"),
+    ".xml": ("xml", "xml"),
+}
+
+
+class ChunkRecord(NamedTuple):
+    text: str
+    metadata: Dict
+
+
+class ReadTask(NamedTuple):
+    file_path: str
+    codebase_root: str
+    relative_path: str
+    previous_hash: Optional[str]
+
+
+class ReadResult(NamedTuple):
+    relative_path: str
+    content_hash: Optional[str]
+    # None when the file was unreadable or empty, [] when it is unchanged
+    chunks: Optional[List[ChunkRecord]]
+    # Measured in the worker, for --profile
+    size: int = 0
+    read_seconds: float = 0.0
+    split_seconds: float = 0.0
+
+
+def read_file_safe(file_path: Path) -> Optional[str]:
+    try:
+        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read()
+    except Exception as e:
+        print(f"[SKIP] Failed to read {file_path}: {e}")
+        logger.warning(f"Failed to read {file_path}: {e}")
+        return None
+
+
+class CodeChunker:
+    """Splits file contents into chunk records. Cheap to build in worker processes."""
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        strategy: str = "declaration",
+    ):
+        if strategy not in CHUNK_STRATEGIES:
+            raise ValueError(f"Unknown chunk strategy: {strategy}")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.strategy = strategy
+        self._init_splitters()
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the chunking settings; chunks differ whenever this does."""
+        fingerprint = f"{self.strategy}:{self.chunk_size}:{self.chunk_overlap}"
+        if self.strategy == "declaration":
+            fingerprint += f":v{DeclarationChunker.VERSION}"
+        return fingerprint
+
+    def _init_splitters(self) -> None:
+        self.kotlin_splitter = RecursiveCharacterTextSplitter.from_language(
+            language=Language.KOTLIN,
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
+        )
+
+        self.markdown_splitter = RecursiveCharacterTextSplitter.from_language(
+            language=Language.MARKDOWN,
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
+        )
+
+        self.java_splitter = RecursiveCharacterTextSplitter.from_language(
+            language=Language.JAVA,
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
+        )
+
+        self.generic_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
+        )
+
+        self.kotlin_declarations = DeclarationChunker(
+            chunk_size=self.chunk_size,
+            fallback_split=self.kotlin_splitter.split_text,
+            kotlin=True,
+        )
+
+        self.java_declarations = DeclarationChunker(
+            chunk_size=self.chunk_size,
+            fallback_split=self.java_splitter.split_text,
+            kotlin=False,
+        )
+
+    def _get_splitter(self, file_type: str) -> RecursiveCharacterTextSplitter:
+        if file_type == "kotlin":
+            return self.kotlin_splitter
+        elif file_type == "markdown":
+            return self.markdown_splitter
+        elif file_type == "java":
+            return self.java_splitter
+        else:
+            return self.generic_splitter
+
+    def _extract_module_name(self, file_path: Path, codebase_root: Path) -> str:
+        try:
+            relative_path = file_path.relative_to(codebase_root)
+            parts = relative_path.parts
+
+            if len(parts) >= 2:
+                if parts[0] in ("core", "feature", "third", "build-logic"):
+                    return f"{parts[0]}:{parts[1]}"
+                elif parts[0] == "app":
+                    return "app"
+                elif parts[0] == "buildSrc":
+                    return "buildSrc"
+
+            return parts[0] if parts else "root"
+        except ValueError:
+            return "unknown"
+
+    def chunk(
+        self,
+        content: str,
+        file_path: Path,
+        codebase_root: Path,
+        relative_path: str,
+    ) -> List[ChunkRecord]:
+        suffix = file_path.suffix.lower()
+        file_type, language = INDEXABLE_EXTENSIONS.get(suffix, ("unknown", "unknown"))
+
+        module_name = self._extract_module_name(file_path, codebase_root)
+        base_metadata = {
+            "file_path": relative_path,
+            "module_name": module_name,
+            "file_type": file_type,
+            "language": language,
+        }
+
+        if self.strategy == "declaration" and file_type in ("kotlin", "java"):
+            declarations = (
+                self.kotlin_declarations if file_type == "kotlin" else self.java_declarations
+            )
+            records = []
+            for idx, chunk in enumerate(declarations.chunk(content)):
+                metadata = dict(
+                    base_metadata,
+                    chunk_index=idx,
+                    symbol=chunk.symbols[0] if chunk.symbols else "",
+                    symbols=",".join(chunk.symbols),
+                    start_line=chunk.start_line,
+                    end_line=chunk.end_line,
+                )
+                records.append(ChunkRecord(text=chunk.text, metadata=metadata))
+            return records
+
+        splitter = self._get_splitter(file_type)
+        chunks = splitter.split_text(content)
+
+        records = []
+        for idx, chunk in enumerate(chunks):
+            metadata = dict(base_metadata, chunk_index=idx)
+            records.append(ChunkRecord(text=chunk, metadata=metadata))
+
+        return records
+
+    def process(self, task: ReadTask) -> ReadResult:
+        file_path = Path(task.file_path)
+        started = time.perf_counter()
+        content = read_file_safe(file_path)
+        if content is None or not content.strip():
+            return ReadResult(task.relative_path, None, None)
+
+        content_hash = hash_content(content)
+        read_seconds = time.perf_counter() - started
+        if content_hash == task.previous_hash:
+            return ReadResult(task.relative_path, content_hash, [], len(content), read_seconds)
+
+        started = time.perf_counter()
+        chunks = self.chunk(content, file_path, Path(task.codebase_root), task.relative_path)
+        return ReadResult(
+            task.relative_path,
+            content_hash,
+            chunks,
+            len(content),
+            read_seconds,
+            time.perf_counter() - started,
+        )
+
+
+_worker_chunker: Optional[CodeChunker] = None
+
+
+def _init_worker(chunk_size: int, chunk_overlap: int, strategy: str) -> None:
+    global _worker_chunker
+    _worker_chunker = CodeChunker(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        strategy=strategy,
+    )
+
+
+def _process_in_worker(task: ReadTask) -> ReadResult:
+    return _worker_chunker.process(task)
+
+
+def process_files(
+    chunker: CodeChunker,
+    tasks: Iterable[ReadTask],
+    workers: int = 1,
+) -> Iterator[ReadResult]:
+    """Read and chunk files, yielding results in task order.
+
+    With `workers > 1` the work fans out over a process pool. Only a bounded
+    window of tasks is in flight at a time, so a slow consumer does not make
+    results pile up in memory.
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield chunker.process(task)
+        return
+
+    window = workers * 4
+    pending: Deque[Future] = deque()
+    # spawn, not fork: the pool is started from a pipeline thread while the
+    # embedding model's threads are running.
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(chunker.chunk_size, chunker.chunk_overlap, chunker.strategy),
+    ) as executor:
+        for task in tasks:
+            pending.append(executor.submit(_process_in_worker, task))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
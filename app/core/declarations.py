@@ -0,0 +1,341 @@
+"""Declaration-aware chunking for Kotlin and Java sources.
+
+A lightweight lexer tracks brace depth while skipping strings, templates and
+comments, so chunks can be cut at declaration boundaries instead of at
+character counts. Each top-level declaration becomes a chunk; small siblings
+are merged, and classes too large for one chunk are split per member.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, List, NamedTuple, Optional
+
+_CODE, _LINE_COMMENT, _BLOCK_COMMENT, _STRING, _CHAR, _RAW_STRING = range(6)
+
+_MODIFIERS = (
+    "public|private|protected|internal|open|abstract|final|sealed|data|enum|"
+    "annotation|inner|value|inline|override|suspend|static|const|lateinit|"
+    "external|operator|infix|tailrec|expect|actual|default|synchronized|native|"
+    "transient|volatile|strictfp|companion|fun"
+)
+
+_DECLARATION_START = re.compile(
+    rf"^(?:(?:{_MODIFIERS})\s+)*"
+    r"(?:class|interface|object|fun|val|var|typealias|enum|record|@interface|"
+    r"init|constructor|package|import)\b"
+)
+
+_NAMED_DECLARATION = re.compile(
+    rf"^(?:@\w+(?:\([^)]*\))?\s+)*(?:(?:{_MODIFIERS})\s+)*"
+    r"(?P<kind>class|interface|object|fun|val|var|typealias|enum|record|@interface)\s+"
+    r"(?:<[^>]*>\s*)?(?:[\w.]+\.)?(?P<name>`[^`]+`|\w+)"
+)
+
+_COMPANION = re.compile(r"^(?:(?:" + _MODIFIERS + r")\s+)*companion\s+object\b")
+
+_JAVA_MEMBER = re.compile(
+    # `package a;` and `import a;` have the shape of a field declaration
+    r"^(?!(?:package|import)\b)(?:@\w+(?:\([^)]*\))?\s+)*(?:(?:public|private|protected|static|final|abstract|"
+    r"synchronized|native|transient|volatile|default|strictfp)\s+)*"
+    r"(?:<[^>]*>\s*)?[\w.<>\[\]?, ]+?\s+(?P<name>\w+)\s*(?P<kind>\(|=|;)"
+)
+
+_JAVA_NOT_NAMES = {"if", "for", "while", "switch", "catch", "return", "new", "throw", "else"}
+
+_CONTAINER_KINDS = {"class", "interface", "object", "enum", "record", "@interface", None}
+
+
+class LineState(NamedTuple):
+    depth: int
+    paren: int
+    in_code: bool
+
+
+class DeclarationChunk(NamedTuple):
+    text: str
+    start_line: int  # 1-based, inclusive
+    end_line: int
+    symbols: List[str]
+
+
+@dataclass
+class _Piece:
+    start: int  # 0-based line index, inclusive
+    end: int  # exclusive
+    kind: Optional[str] = None
+    names: List[str] = field(default_factory=list)
+    declares: bool = False
+
+
+def scan_lines(content: str, kotlin: bool) -> List[LineState]:
+    """Return brace/paren depth and lexer state at the start of every line."""
+    states = [LineState(0, 0, True)]
+    depth = paren = 0
+    state = _CODE
+    block_nesting = 0
+    # Brace depth and string kind of each open "${ ... }" string template
+    templates: List[tuple] = []
+    i = 0
+    n = len(content)
+    while i < n:
+        c = content[i]
+        if c == "\n":
+            if state in (_LINE_COMMENT, _STRING, _CHAR):
+                state = _CODE
+            states.append(LineState(depth, paren, state == _CODE))
+            i += 1
+            continue
+
+        if state == _CODE:
+            if content.startswith("//", i):
+                state = _LINE_COMMENT
+                i += 2
+                continue
+            if content.startswith("/*", i):
+                state = _BLOCK_COMMENT
+                block_nesting = 1
+                i += 2
+                continue
+            if content.startswith('"""', i):
+                state = _RAW_STRING
+                i += 3
+                continue
+            if c == '"':
+                state = _STRING
+            elif c == "'":
+                state = _CHAR
+            elif c == "{":
+                depth += 1
+            elif c == "}":
+                if templates and templates[-1][0] == depth:
+                    state = templates.pop()[1]
+                depth = max(depth - 1, 0)
+            elif c in "([":
+                paren += 1
+            elif c in ")]":
+                paren = max(paren - 1, 0)
+            i += 1
+        elif state == _BLOCK_COMMENT:
+            if content.startswith("*/", i):
+                block_nesting -= 1
+                i += 2
+                if block_nesting == 0:
+                    state = _CODE
+            elif kotlin and content.startswith("/*", i):
+                block_nesting += 1
+                i += 2
+            else:
+                i += 1
+        elif state == _LINE_COMMENT:
+            i += 1
+        elif state == _RAW_STRING:
+            if content.startswith('"""', i):
+                state = _CODE
+                i += 3
+            elif kotlin and content.startswith("${", i):
+                depth += 1
+                templates.append((depth, _RAW_STRING))
+                state = _CODE
+                i += 2
+            else:
+                i += 1
+        else:
+            if c == "\\":
+                i += 2
+                continue
+            if state == _STRING and kotlin and content.startswith("${", i):
+                depth += 1
+                templates.append((depth, _STRING))
+                state = _CODE
+                i += 2
+                continue
+            if (state == _STRING and c == '"') or (state == _CHAR and c == "'"):
+                state = _CODE
+            i += 1
+    return states
+
+
+# "NAME," / "NAME(args)," / "NAME;" / a bare last "NAME"; "TODO()" is a call
+_ENUM_CONSTANT = re.compile(r"^(?P<name>[A-Z][A-Z0-9_]+)\s*(?:(?:\(.*\))?\s*[,;]|\{)?\s*(?://.*)?$")
+
+
+def declared_names(text: str) -> List[str]:
+    """Names declared anywhere in `text`: types, functions, properties and enum constants.
+
+    A line-based scan, so it also works on chunks cut by the character splitter.
+    """
+    names: List[str] = []
+    for line in text.split("\n"):
+        stripped = line.strip()
+        match = _NAMED_DECLARATION.match(stripped)
+        if match:
+            names.append(match.group("name").strip("`"))
+            continue
+        match = _ENUM_CONSTANT.match(stripped)
+        if match:
+            names.append(match.group("name"))
+    return list(dict.fromkeys(names))
+
+
+def _is_comment_or_annotation(stripped: str) -> bool:
+    return stripped.startswith(("//", "/*", "*", "@")) and not _NAMED_DECLARATION.match(stripped)
+
+
+def _describe(line: str, kotlin: bool) -> tuple:
+    stripped = line.strip()
+    if _COMPANION.match(stripped):
+        return "object", "Companion"
+    match = _NAMED_DECLARATION.match(stripped)
+    if match:
+        kind = match.group("kind")
+        return kind, match.group("name").strip("`")
+    if not kotlin:
+        match = _JAVA_MEMBER.match(stripped)
+        if match and match.group("name") not in _JAVA_NOT_NAMES:
+            return ("fun" if match.group("kind") == "(" else "val"), match.group("name")
+    return None, None
+
+
+class DeclarationChunker:
+    """Cuts Kotlin/Java sources into declaration-sized chunks."""
+
+    # Bumped whenever the same source may be cut or labelled differently
+    VERSION = 2
+
+    def __init__(
+        self,
+        chunk_size: int,
+        fallback_split: Callable[[str], List[str]],
+        kotlin: bool,
+    ):
+        self.chunk_size = chunk_size
+        self.fallback_split = fallback_split
+        self.kotlin = kotlin
+
+    def _starts_piece(self, stripped: str, previous_code: str) -> bool:
+        if not stripped:
+            return False
+        if _DECLARATION_START.match(stripped) or stripped.startswith(("@", "/*", "//")):
+            return True
+        if self.kotlin:
+            return False
+        # Java members have no keyword; a new one starts after a finished statement
+        if stripped.startswith(("}", ".", ")", "+", "-", "&", "|", "?", ":")):
+            return False
+        return previous_code.endswith((";", "}")) or previous_code == ""
+
+    def _segment(self, lines: List[str], states: List[LineState], start: int, end: int, depth: int) -> List[_Piece]:
+        pieces: List[_Piece] = []
+        previous_code = ""
+        for index in range(start, end):
+            state = states[index]
+            stripped = lines[index].strip()
+            at_level = state.depth == depth and state.paren == 0 and state.in_code
+            if at_level and self._starts_piece(stripped, previous_code):
+                if pieces and pieces[-1].end < index:
+                    pieces[-1].end = index
+                kind, name = _describe(stripped, self.kotlin)
+                pieces.append(_Piece(index, index + 1, kind, [name] if name else [], name is not None))
+            elif not pieces:
+                pieces.append(_Piece(index, index + 1))
+            pieces[-1].end = index + 1
+            if state.in_code and stripped and not stripped.startswith(("//", "/*", "*", "@")):
+                previous_code = stripped
+
+        # Leading comments and annotations belong to the declaration they precede
+        merged: List[_Piece] = []
+        carry: Optional[_Piece] = None
+        for piece in pieces:
+            code_lines = [lines[i].strip() for i in range(piece.start, piece.end) if lines[i].strip()]
+            is_preamble = not piece.declares and code_lines and all(
+                _is_comment_or_annotation(line) for line in code_lines
+            )
+            if carry is not None:
+                piece.start = carry.start
+                carry = None
+            if is_preamble:
+                carry = piece
+                continue
+            merged.append(piece)
+        if carry is not None:
+            if merged:
+                merged[-1].end = carry.end
+            else:
+                merged.append(carry)
+        return merged
+
+    def _size(self, lines: List[str], start: int, end: int) -> int:
+        return sum(len(lines[i]) + 1 for i in range(start, end))
+
+    def _expand(self, lines: List[str], states: List[LineState], piece: _Piece, depth: int, prefix: str) -> List[_Piece]:
+        qualified = [f"{prefix}{name}" for name in piece.names]
+        piece.names = qualified
+        if self._size(lines, piece.start, piece.end) <= self.chunk_size:
+            return [piece]
+        if piece.kind not in _CONTAINER_KINDS:
+            return [piece]
+
+        body_start = next(
+            (i for i in range(piece.start + 1, piece.end) if states[i].depth > depth),
+            None,
+        )
+        if body_start is None:
+            return [piece]
+        body_end = body_start
+        while body_end < piece.end and states[body_end].depth > depth:
+            body_end += 1
+
+        owner = f"{qualified[0]}." if qualified else prefix
+        result = [_Piece(piece.start, body_start, piece.kind, list(qualified), piece.declares)]
+        for member in self._segment(lines, states, body_start, body_end, depth + 1):
+            result.extend(self._expand(lines, states, member, depth + 1, owner))
+        if body_end < piece.end:
+            result.append(_Piece(body_end, piece.end))
+        return result
+
+    def _pack(self, lines: List[str], pieces: List[_Piece]) -> List[_Piece]:
+        packed: List[_Piece] = []
+        for piece in pieces:
+            size = self._size(lines, piece.start, piece.end)
+            if packed:
+                last = packed[-1]
+                if self._size(lines, last.start, last.end) + size <= self.chunk_size:
+                    last.end = piece.end
+                    last.names.extend(piece.names)
+                    continue
+            packed.append(_Piece(piece.start, piece.end, piece.kind, list(piece.names), piece.declares))
+        return packed
+
+    def chunk(self, content: str) -> List[DeclarationChunk]:
+        lines = content.split("\n")
+        states = scan_lines(content, self.kotlin)
+
+        pieces: List[_Piece] = []
+        for piece in self._segment(lines, states, 0, len(lines), 0):
+            pieces.extend(self._expand(lines, states, piece, 0, ""))
+
+        chunks: List[DeclarationChunk] = []
+        for piece in self._pack(lines, pieces):
+            raw = "\n".join(lines[piece.start : piece.end])
+            text = raw.lstrip("\n")
+            first_line = piece.start + 1 + (len(raw) - len(text))
+            text = text.rstrip()
+            if not text:
+                continue
+            if len(text) <= self.chunk_size:
+                last_line = first_line + text.count("\n")
+                chunks.append(DeclarationChunk(text, first_line, last_line, piece.names))
+                continue
+
+            # Oversized leaf (e.g. a long function): fall back to the text splitter
+            cursor = 0
+            for part in self.fallback_split(text):
+                offset = text.find(part, cursor)
+                if offset < 0:
+                    offset = cursor
+                else:
+                    cursor = offset + 1
+                start_line = first_line + text.count("\n", 0, offset)
+                end_line = start_line + part.count("\n")
+                chunks.append(DeclarationChunk(part, start_line, end_line, piece.names))
+        return chunks
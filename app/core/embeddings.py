@@ -0,0 +1,155 @@
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rough chars-per-token ratio for source code, used when no tokenizer is at hand
+CHARS_PER_TOKEN = 3
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def embedding_model_key(backend: Optional[str] = None) -> str:
+    """Identify the vectors a backend produces, e.g. for cache keys.
+
+    The ONNX export is numerically equivalent to PyTorch, the int8 model is not.
+    """
+    backend = backend or settings.embedding_backend
+    if backend == "onnx-int8":
+        return f"{settings.embedding_model}@{backend}:{settings.embedding_onnx_quantization}"
+    return settings.embedding_model
+
+
+def _onnx_model_dir() -> Path:
+    return settings.embedding_model_cache_dir / f"{settings.embedding_model.replace('/', '--')}-onnx"
+
+
+def _prepare_onnx_model(backend: str) -> Tuple[str, Dict]:
+    """Export the ONNX (and int8) model once and return its path and load kwargs."""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    model_dir = _onnx_model_dir()
+    quantized_file = f"onnx/model_qint8_{settings.embedding_onnx_quantization}.onnx"
+
+    if not (model_dir / "onnx" / "model.onnx").exists():
+        logger.info(f"Exporting {settings.embedding_model} to ONNX at {model_dir}...")
+        model = SentenceTransformer(
+            settings.embedding_model,
+            backend="onnx",
+            device="cpu",
+            trust_remote_code=True,
+        )
+        model.save_pretrained(str(model_dir))
+
+    if backend == "onnx-int8" and not (model_dir / quantized_file).exists():
+        logger.info(
+            f"Quantizing ONNX model to int8 ({settings.embedding_onnx_quantization})..."
+        )
+        model = SentenceTransformer(str(model_dir), backend="onnx", device="cpu", trust_remote_code=True)
+        export_dynamic_quantized_onnx_model(
+            model,
+            quantization_config=settings.embedding_onnx_quantization,
+            model_name_or_path=str(model_dir),
+        )
+
+    model_kwargs: Dict = {"backend": "onnx"}
+    if backend == "onnx-int8":
+        model_kwargs["model_kwargs"] = {"file_name": quantized_file}
+    return str(model_dir), model_kwargs
+
+
+def get_embeddings(batch_size: int = 32, backend: Optional[str] = None) -> HuggingFaceEmbeddings:
+    backend = backend or settings.embedding_backend
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(
+            f"Unknown embedding backend: {backend} (expected one of {', '.join(EMBEDDING_BACKENDS)})"
+        )
+
+    model_name = settings.embedding_model
+    model_kwargs = {'device': settings.embedding_device, 'trust_remote_code': True}
+    if backend != "torch":
+        try:
+            model_name, onnx_kwargs = _prepare_onnx_model(backend)
+            model_kwargs.update(onnx_kwargs)
+        except Exception as e:
+            # e.g. optimum/onnxruntime missing or an architecture that cannot be exported
+            logger.warning(f"ONNX backend unavailable, falling back to torch: {e}")
+            backend = "torch"
+            model_name = settings.embedding_model
+
+    embeddings = HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs=model_kwargs,
+        encode_kwargs={'normalize_embeddings': True, 'batch_size': batch_size},
+    )
+    logger.info(
+        f"Loaded embedding model: {settings.embedding_model} "
+        f"(backend: {backend}, device: {settings.embedding_device})"
+    )
+    return embeddings
+
+
+def _unwrap(embeddings: Embeddings) -> Embeddings:
+    while hasattr(embeddings, "embeddings"):
+        embeddings = embeddings.embeddings
+    return embeddings
+
+
+def token_length_estimator(embeddings: Embeddings) -> Callable[[List[str]], List[int]]:
+    """Return a function that measures token lengths with the model's tokenizer.
+
+    Falls back to a character based estimate when the embeddings object does not
+    expose a sentence-transformers client.
+    """
+    client = getattr(_unwrap(embeddings), "_client", None)
+    tokenizer = getattr(client, "tokenizer", None)
+    max_length = getattr(client, "max_seq_length", None) or 8192
+
+    if tokenizer is None:
+        def estimate(texts: List[str]) -> List[int]:
+            return [min(len(text) // CHARS_PER_TOKEN + 1, max_length) for text in texts]
+
+        return estimate
+
+    def measure(texts: List[str]) -> List[int]:
+        input_ids = tokenizer(texts, add_special_tokens=True, truncation=False)["input_ids"]
+        return [min(len(ids), max_length) for ids in input_ids]
+
+    return measure
+
+
+def plan_batches(
+    lengths: List[int],
+    token_budget: int,
+    max_batch_size: Optional[int] = None,
+) -> List[List[int]]:
+    """Group indices into length-sorted batches whose padded size fits the budget.
+
+    A batch is padded to its longest sequence, so its cost is
+    `len(batch) * max(lengths in batch)`. Sorting first keeps similar lengths
+    together, which minimizes the compute wasted on padding.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for index in order:
+        longest = lengths[index]  # ascending order, so the newest item is the longest
+        too_many = max_batch_size is not None and len(current) >= max_batch_size
+        if current and (too_many or (len(current) + 1) * longest > token_budget):
+            batches.append(current)
+            current = []
+        current.append(index)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def padded_tokens(lengths: List[int], batches: List[List[int]]) -> int:
+    """Tokens actually computed for `batches`, each padded to its longest sequence."""
+    return sum(len(batch) * max(lengths[i] for i in batch) for batch in batches if batch)
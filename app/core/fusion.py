@@ -0,0 +1,28 @@
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[T]],
+    key: Callable[[T], Hashable],
+    k: int = 60,
+    limit: Optional[int] = None,
+) -> List[T]:
+    """Merge ranked lists by summing 1 / (k + rank) for every list an item is in.
+
+    Only ranks are used, so lists scored on different scales (distances from
+    separate collections, BM25 scores) can be merged without normalization.
+    The first occurrence of an item is the one returned.
+    """
+    scores: Dict[Hashable, float] = {}
+    items: Dict[Hashable, T] = {}
+    for ranked in ranked_lists:
+        for rank, item in enumerate(ranked, start=1):
+            item_key = key(item)
+            scores[item_key] = scores.get(item_key, 0.0) + 1.0 / (k + rank)
+            items.setdefault(item_key, item)
+    order = sorted(scores, key=lambda item_key: scores[item_key], reverse=True)
+    if limit is not None:
+        order = order[:limit]
+    return [items[item_key] for item_key in order]
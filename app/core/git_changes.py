@@ -0,0 +1,108 @@
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+from git import GitCommandError, InvalidGitRepositoryError, NoSuchPathError, Repo
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class GitChanges:
+    """Paths changed since a commit, relative to the indexed codebase root."""
+
+    head_commit: Optional[str]
+    changed: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+
+
+def _open_repo(codebase_path: Path) -> Optional[Repo]:
+    try:
+        return Repo(codebase_path, search_parent_directories=True)
+    except (InvalidGitRepositoryError, NoSuchPathError):
+        return None
+
+
+def _head_commit(repo: Repo) -> Optional[str]:
+    try:
+        return repo.head.commit.hexsha
+    except ValueError:
+        # Repository without any commits yet
+        return None
+
+
+def get_head_commit(codebase_path: Path) -> Optional[str]:
+    repo = _open_repo(codebase_path)
+    return _head_commit(repo) if repo else None
+
+
+def _to_codebase_relative(repo_path: str, prefix: Path) -> Optional[str]:
+    path = Path(repo_path)
+    if prefix == Path("."):
+        return str(path)
+    try:
+        return str(path.relative_to(prefix))
+    except ValueError:
+        return None
+
+
+def collect_git_changes(codebase_path: Path, since: str) -> Optional[GitChanges]:
+    """Ask git which paths were added, modified, renamed or deleted since `since`.
+
+    Includes uncommitted working tree changes and untracked (non-ignored) files,
+    so the result matches what a full walk of the tree would find. Returns None
+    when git cannot diff against `since` (unknown ref after a shallow clone or
+    a force-push); the caller then falls back to a full walk.
+    """
+    repo = _open_repo(codebase_path)
+    if repo is None:
+        raise ValueError(f"Not a git repository: {codebase_path}")
+
+    repo_root = Path(repo.working_tree_dir).resolve()
+    prefix = codebase_path.resolve().relative_to(repo_root)
+    pathspec = str(prefix) if prefix != Path(".") else "."
+
+    try:
+        output = repo.git.diff("--name-status", "-M", "-z", since, "--", pathspec)
+    except GitCommandError as e:
+        logger.warning(f"git diff against {since} failed: {str(e.stderr or e).strip()}")
+        return None
+    tokens = [token for token in output.split("\0") if token]
+
+    changed = set()
+    deleted = set()
+    i = 0
+    while i < len(tokens):
+        status = tokens[i][0]
+        if status in ("R", "C"):
+            old_path, new_path = tokens[i + 1], tokens[i + 2]
+            if status == "R":
+                deleted.add(old_path)
+            changed.add(new_path)
+            i += 3
+            continue
+        path = tokens[i + 1]
+        if status == "D":
+            deleted.add(path)
+        else:
+            changed.add(path)
+        i += 2
+
+    changed.update(repo.untracked_files)
+
+    result = GitChanges(head_commit=_head_commit(repo))
+    for repo_path in sorted(changed):
+        relative = _to_codebase_relative(repo_path, prefix)
+        if relative is not None:
+            result.changed.append(relative)
+    for repo_path in sorted(deleted - changed):
+        relative = _to_codebase_relative(repo_path, prefix)
+        if relative is not None:
+            result.deleted.append(relative)
+
+    logger.info(
+        f"git diff {since[:12]}..working tree: "
+        f"{len(result.changed)} changed, {len(result.deleted)} deleted"
+    )
+    return result
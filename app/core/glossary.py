@@ -0,0 +1,304 @@
+"""Korean -> English glossary mined from the codebase, for LLM-free query translation.
+
+Most questions use a small domain vocabulary (명함, 결제, 회원가입). The
+glossary is built offline by `scripts/build_glossary.py` from string
+resources, comments above declarations, markdown and past LLM translations.
+At query time a question whose Korean words are covered by the glossary is
+translated locally, with the runner-up English terms appended as expansions.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app.core.declarations import declared_names
+from app.core.korean import HANGUL_WORD, korean_words, stem
+
+logger = logging.getLogger(__name__)
+
+# Question and filler words that carry nothing to search for
+KOREAN_STOPWORDS = {
+    "어디", "어디서", "어디에", "어떻게", "어떤", "어느", "무엇", "무슨", "뭐", "뭔가", "뭐야", "뭔지",
+    "왜", "언제", "누가", "있는", "있어", "있나", "있나요", "알려", "알려줘", "설명", "좀", "그리고",
+    "코드", "부분", "로직", "방법", "경우", "관련", "하는", "되는", "해줘", "보여줘", "찾아줘",
+}
+ENGLISH_STOPWORDS = {
+    "the", "a", "an", "to", "of", "is", "are", "for", "and", "or", "in", "on", "at", "by", "with",
+    "be", "it", "this", "that", "as", "from", "fun", "val", "var", "class", "object", "return",
+    "private", "public", "override", "string", "int", "get", "set", "new", "null", "true", "false",
+    "import", "package", "id", "res", "xml", "kt", "java", "todo",
+}
+
+_ENGLISH_WORD = re.compile(r"[A-Za-z][A-Za-z0-9]*")
+_CAMEL_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+")
+_QUERY_TOKEN = re.compile(r"[가-힣]+|[A-Za-z0-9_.]+")
+# 결제(payment) / payment (결제)
+_PAREN_KO_EN = re.compile(r"([가-힣][가-힣 ]{0,20}?)\s*\(\s*([A-Za-z][A-Za-z0-9 _-]{1,40}?)\s*\)")
+_PAREN_EN_KO = re.compile(r"([A-Za-z][A-Za-z0-9_]*(?: [A-Za-z][A-Za-z0-9_]*){0,3})\s*\(\s*([가-힣][가-힣 ]{0,20}?)\s*\)")
+_COMMENT = re.compile(r"^\s*(?://+|/\*+|\*+(?!/)|#)\s?(.*?)\s*(?:\*/)?\s*$")
+_STRING_RESOURCE = re.compile(r'<string\s+name="([^"]+)"[^>]*>(.*?)</string>', re.S)
+_XML_MARKUP = re.compile(r"<[^>]+>|%\d*\$?[sd]|\\n")
+
+CODE_LANGUAGES = (".kt", ".kts", ".java")
+
+
+def english_words(text: str) -> List[str]:
+    """Lowercased words of English text and identifiers (camelCase / snake_case split)."""
+    words = []
+    for token in _ENGLISH_WORD.findall(text.replace("_", " ")):
+        for part in _CAMEL_PART.findall(token):
+            part = part.lower()
+            if len(part) >= 2 and part not in ENGLISH_STOPWORDS:
+                words.append(part)
+    return words
+
+
+def korean_terms(text: str) -> List[str]:
+    """Noun stems of the Korean words in `text`, stopwords dropped."""
+    terms = []
+    for word in korean_words(text):
+        term = stem(word)
+        if len(term) >= 2 and term not in KOREAN_STOPWORDS and word not in KOREAN_STOPWORDS:
+            terms.append(term)
+    return terms
+
+
+class GlossaryTranslation(NamedTuple):
+    text: str
+    # Share of Korean (non-stopword) characters matched by glossary terms
+    coverage: float
+    terms: Dict[str, List[str]]
+
+
+class Glossary:
+    """Korean term -> English terms, best first."""
+
+    VERSION = 1
+    MAX_TERM_LENGTH = 8
+
+    def __init__(self, terms: Dict[str, List[str]], path: Optional[Path] = None, mtime: float = 0.0):
+        self.terms = terms
+        self.path = path
+        self.mtime = mtime
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    @classmethod
+    def load(cls, path: Path) -> "Glossary":
+        try:
+            mtime = path.stat().st_mtime
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls({}, path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable glossary {path}: {e}")
+            return cls({}, path)
+        if data.get("version") != cls.VERSION:
+            return cls({}, path, mtime)
+        return cls(data.get("terms", {}), path, mtime)
+
+    def save(self, path: Path, **meta) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": self.VERSION, "built_at": time.time(), **meta, "terms": self.terms},
+                f,
+                ensure_ascii=False,
+                indent=1,
+            )
+        os.replace(tmp_path, path)
+
+    def reload_if_changed(self) -> "Glossary":
+        if self.path is None:
+            return self
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return self
+        if mtime == self.mtime:
+            return self
+        glossary = Glossary.load(self.path)
+        logger.info(f"Reloaded glossary {self.path} ({len(glossary)} terms)")
+        return glossary
+
+    def _segment(self, word: str) -> Tuple[List[str], int]:
+        """Greedy longest-match split of a word into glossary terms, and the characters matched."""
+        keys = []
+        covered = 0
+        i = 0
+        while i < len(word):
+            for j in range(min(len(word), i + self.MAX_TERM_LENGTH), i + 1, -1):
+                if word[i:j] in self.terms:
+                    keys.append(word[i:j])
+                    covered += j - i
+                    i = j
+                    break
+            else:
+                i += 1
+        return keys, covered
+
+    def translate(self, query: str, expansions: int = 1) -> GlossaryTranslation:
+        """Replace Korean words with their English terms, keeping everything else."""
+        parts: List[str] = []
+        terms: Dict[str, List[str]] = {}
+        covered = total = 0
+        for token in _QUERY_TOKEN.findall(query):
+            if not HANGUL_WORD.fullmatch(token):
+                parts.append(token)
+                continue
+            word = stem(token)
+            # Single syllables left over are verbs and fillers (해, 돼, 좀), never terms
+            if len(word) < 2 or token in KOREAN_STOPWORDS or word in KOREAN_STOPWORDS:
+                continue
+            keys, matched = self._segment(word)
+            total += len(word)
+            covered += matched
+            for key in keys:
+                terms[key] = self.terms[key][: 1 + expansions]
+                parts.extend(terms[key])
+
+        if total:
+            coverage = covered / total
+        else:
+            coverage = 1.0 if parts else 0.0
+        return GlossaryTranslation(" ".join(dict.fromkeys(parts)), coverage, terms)
+
+
+class GlossaryBuilder:
+    """Collects Korean/English evidence and turns it into a Glossary.
+
+    Two kinds of evidence: direct pairs (a Korean string resource and its
+    English counterpart, "결제(payment)") and co-occurrence of Korean stems
+    with English words in the same unit (a comment and the declaration under
+    it, a past question and its translation). Co-occurrence is scored with the
+    Dice coefficient so frequent words do not attach to every term.
+    """
+
+    # Units pairing more words than this are paragraphs, not translations
+    MAX_PAIRS_PER_UNIT = 60
+
+    def __init__(self):
+        self.direct: Dict[str, Counter] = defaultdict(Counter)
+        self.pairs: Dict[str, Counter] = defaultdict(Counter)
+        self.korean_counts: Counter = Counter()
+        self.english_counts: Counter = Counter()
+        self._strings: Dict[str, List[str]] = defaultdict(list)
+        self.sources: Counter = Counter()
+
+    def add_direct(self, korean: str, english: str, weight: float = 1.0) -> None:
+        term = "".join(korean_terms(korean))
+        phrase = " ".join(english_words(english))
+        if 2 <= len(term) <= Glossary.MAX_TERM_LENGTH and phrase and len(phrase.split()) <= 4:
+            self.direct[term][phrase] += weight
+
+    def add_cooccurrence(self, korean: str, english: str, weight: float = 1.0) -> None:
+        ko = set(korean_terms(korean))
+        en = set(english_words(english))
+        if not ko or not en or len(ko) * len(en) > self.MAX_PAIRS_PER_UNIT:
+            return
+        for term in ko:
+            self.korean_counts[term] += weight
+            for word in en:
+                self.pairs[term][word] += weight
+        for word in en:
+            self.english_counts[word] += weight
+
+    def add_parentheticals(self, text: str, weight: float = 2.0) -> None:
+        for korean, english in _PAREN_KO_EN.findall(text):
+            self.add_direct(korean, english, weight)
+        for english, korean in _PAREN_EN_KO.findall(text):
+            self.add_direct(korean, english, weight)
+
+    def add_translation(self, question: str, translation: str) -> None:
+        self.add_cooccurrence(question, translation)
+        self.sources["translations"] += 1
+
+    def add_file(self, relative_path: str, content: str) -> None:
+        name = Path(relative_path).name
+        if name.endswith(".xml") and "/values" in "/" + relative_path.replace("\\", "/"):
+            # English-only resource files hold the other half of each pair
+            self._add_string_resources(content)
+            self.sources["string_resources"] += 1
+        elif not HANGUL_WORD.search(content):
+            return
+        elif name.endswith(CODE_LANGUAGES):
+            self._add_code_comments(content)
+            self.sources["code"] += 1
+        elif name.endswith(".md"):
+            for line in content.splitlines():
+                if HANGUL_WORD.search(line) and _ENGLISH_WORD.search(line):
+                    self.add_parentheticals(line)
+                    self.add_cooccurrence(line, line, weight=0.5)
+            self.sources["markdown"] += 1
+
+    def _add_string_resources(self, content: str) -> None:
+        # Same resource name across values/ and values-<locale>/ pairs the translations
+        for key, text in _STRING_RESOURCE.findall(content):
+            self._strings[key].append(_XML_MARKUP.sub(" ", text).strip())
+
+    def _add_code_comments(self, content: str) -> None:
+        lines = content.splitlines()
+        comment: List[str] = []
+        for i, line in enumerate(lines):
+            match = _COMMENT.match(line)
+            if match and not line.strip().startswith("*/"):
+                comment.append(match.group(1))
+                continue
+            if not line.strip():
+                continue
+            if comment:
+                text = " ".join(comment)
+                if HANGUL_WORD.search(text):
+                    self.add_parentheticals(text)
+                    names = declared_names("\n".join(lines[i : i + 3]))
+                    if names:
+                        self.add_cooccurrence(text, " ".join(names))
+                comment = []
+
+    def _pair_string_resources(self) -> None:
+        for key, texts in self._strings.items():
+            korean = [text for text in texts if HANGUL_WORD.search(text)]
+            english = [text for text in texts if not HANGUL_WORD.search(text) and _ENGLISH_WORD.search(text)]
+            for ko in korean:
+                for en in english:
+                    self.add_direct(ko, en, weight=3.0)
+                    self.add_cooccurrence(ko, en)
+                # The resource name itself (payment_failed_title) names the concept
+                self.add_cooccurrence(ko, key, weight=0.5)
+        self._strings.clear()
+
+    def build(self, min_count: float = 2.0, min_score: float = 1.0, max_terms: int = 3) -> Glossary:
+        self._pair_string_resources()
+        terms: Dict[str, List[str]] = {}
+        for term in set(self.direct) | set(self.pairs):
+            scores: Counter = Counter()
+            for phrase, weight in self.direct.get(term, {}).items():
+                scores[phrase] += 3 * weight
+            for word, count in self.pairs.get(term, {}).items():
+                if count < min_count:
+                    continue
+                dice = 2 * count / (self.korean_counts[term] + self.english_counts[word])
+                scores[word] += count * dice
+
+            chosen: List[str] = []
+            seen_words = set()
+            for english, score in scores.most_common():
+                if score < min_score or len(chosen) >= max_terms:
+                    break
+                words = set(english.split())
+                # "card" adds nothing once "business card" is in
+                if words <= seen_words:
+                    continue
+                chosen.append(english)
+                seen_words |= words
+            if chosen:
+                terms[term] = chosen
+        return Glossary(dict(sorted(terms.items())))
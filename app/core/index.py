@@ -1,35 +1,119 @@
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterator, List, Optional, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain.text_splitter import Language, RecursiveCharacterTextSplitter
-from langchain.schema import Document
 
 from app.config import settings
+from app.core.chunk_index import ChunkIndex
+from app.core.chunking import (
+    INDEXABLE_EXTENSIONS,
+    ChunkRecord,
+    CodeChunker,
+    ReadTask,
+    process_files,
+    read_file_safe,
+)
+from app.core.embedding_cache import CachedEmbeddings, EmbeddingCache
+from app.core.embeddings import (
+    embedding_model_key,
+    get_embeddings,
+    padded_tokens,
+    plan_batches,
+    token_length_estimator,
+)
+from app.core.git_changes import collect_git_changes, get_head_commit
+from app.core.lexical import LexicalIndex
+from app.core.manifest import IndexManifest, hash_content, make_chunk_id
+from app.core.pipeline import StreamingPipeline
+from app.core.profiler import BuildProfiler
+from app.core.quantization import (
+    QuantizedIndex,
+    export_quantized_index,
+    quantized_index_path,
+    update_quantized_index,
+)
+from app.core.symbols import SymbolIndex
+from app.core.vectorstore import close_vectorstore, open_vectorstore
+from app.core.versions import LEGACY_VERSION, IndexVersion, IndexVersions
+from app.core.walker import FileWalker
 
 logger = logging.getLogger(__name__)
 
 
-def get_embeddings():
-    return HuggingFaceEmbeddings(
-        model_name=settings.embedding_model,
-        model_kwargs={'device': 'cpu', 'trust_remote_code': True},
-        encode_kwargs={'normalize_embeddings': True},
-    )
+@dataclass
+class FileChunks:
+    relative_path: str
+    content_hash: str
+    chunks: List[ChunkRecord]
+    chunk_ids: List[str]
+    previous_chunk_ids: List[str]
+    is_new: bool
+
+
+@dataclass
+class WriteBatch:
+    ids: List[str] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+    metadatas: List[Dict] = field(default_factory=list)
+    embeddings: List[List[float]] = field(default_factory=list)
+    delete_ids: List[str] = field(default_factory=list)
+    delete_paths: List[str] = field(default_factory=list)
+    completed_files: List[FileChunks] = field(default_factory=list)
+
+
+@dataclass
+class IndexBuild:
+    """Mutable state of one index_codebase run, shared by the pipeline stages."""
+
+    codebase_path: Path
+    vectorstore: Chroma
+    manifest: IndexManifest
+    batch_size: int
+    legacy_collection: bool
+    checkpoint_every: int = 10
+    profiler: Optional[BuildProfiler] = None
+    # Auxiliary indexes updated alongside every Chroma write
+    side_indexes: List[ChunkIndex] = field(default_factory=list)
+    rechunk_all: bool = False
+    seen_paths: Set[str] = field(default_factory=set)
+    # Files written by this build, recorded in checkpoints for --resume
+    written_paths: Set[str] = field(default_factory=set)
+    skipped_paths: Set[str] = field(default_factory=set)
+    # Chunks upserted by this build, whose quantized rows must be refreshed
+    written_ids: Set[str] = field(default_factory=set)
+    files_processed: int = 0
+    files_skipped: int = 0
+    files_added: int = 0
+    files_updated: int = 0
+    chunks_created: int = 0
+    chunks_written: int = 0
+    batches_written: int = 0
+    chunks_embedded: int = 0
+    embedding_seconds: float = 0.0
+    # Real and padded token counts of every forward pass
+    tokens_embedded: int = 0
+    tokens_padded: int = 0
+    checkpoints_saved: int = 0
+
+
+@dataclass
+class ChangeScan:
+    """Files that differ from the live version, found before any version is created."""
+
+    # Changed, added and deleted paths relative to the codebase root
+    paths: List[str]
+    walker: FileWalker
+    manifest: IndexManifest
 
 
 class CodebaseIndexer:
 
-    INDEXABLE_EXTENSIONS = {
-        ".kt": ("kotlin", "kotlin"),
-        ".kts": ("kotlin", "kotlin"),
-        ".java": ("java", "java"),
-        ".gradle": ("gradle", "groovy"),
-        ".md": ("markdown", "markdown"),
-        ".xml": ("xml", "xml"),
-    }
+    INDEXABLE_EXTENSIONS = INDEXABLE_EXTENSIONS
 
     SKIP_DIRS = {
         ".git",
@@ -38,6 +122,7 @@ class CodebaseIndexer:
         "build",
         ".cxx",
         ".kotlin",
+        "node_modules",
     }
 
     SKIP_PATTERNS = {
@@ -56,51 +141,56 @@ class CodebaseIndexer:
         ".dex",
     }
 
-    COLLECTION_NAME = settings.collection_name
+    # Upper bound on sequences per forward pass, whatever the token budget allows
+    MAX_EMBED_BATCH = 256
+    # Chunks planned into forward passes together, across write batches. A
+    # wider window finds more chunks of similar length to pad together.
+    EMBED_WINDOW = 2048
 
     def __init__(
         self,
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
+        workers: int = 1,
+        token_budget: int = 16384,
+        ignore_file: Optional[Path] = None,
+        chunk_strategy: str = "declaration",
+        collection_name: Optional[str] = None,
+        shared_from: Optional["CodebaseIndexer"] = None,
     ):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.embeddings = get_embeddings()
-        self._init_splitters()
-
-    def _init_splitters(self) -> None:
-        self.kotlin_splitter = RecursiveCharacterTextSplitter.from_language(
-            language=Language.KOTLIN,
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-        )
-
-        self.markdown_splitter = RecursiveCharacterTextSplitter.from_language(
-            language=Language.MARKDOWN,
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-        )
-
-        self.java_splitter = RecursiveCharacterTextSplitter.from_language(
-            language=Language.JAVA,
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-        )
-
-        self.generic_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-        )
-
-    def _get_splitter(self, file_type: str) -> RecursiveCharacterTextSplitter:
-        if file_type == "kotlin":
-            return self.kotlin_splitter
-        elif file_type == "markdown":
-            return self.markdown_splitter
-        elif file_type == "java":
-            return self.java_splitter
+        self.workers = workers
+        self.token_budget = token_budget
+        self.ignore_file = ignore_file
+        self.collection_name = collection_name or settings.collection_name
+        if shared_from is not None:
+            # Shards built side by side share one model instead of loading it per collection
+            self.embeddings = shared_from.embeddings
+            self._token_lengths = shared_from._token_lengths
+            self._model_lock = shared_from._model_lock
+            if isinstance(self.embeddings, CachedEmbeddings):
+                # Same model and cache, but hit/miss counters of this shard only
+                self.embeddings = CachedEmbeddings(self.embeddings.embeddings, self.embeddings.cache)
         else:
-            return self.generic_splitter
+            self.embeddings = get_embeddings(batch_size=self.MAX_EMBED_BATCH)
+            self._token_lengths = token_length_estimator(self.embeddings)
+            # The tokenizer and model are not safe to call from several threads at once
+            self._model_lock = threading.Lock()
+            if settings.embedding_cache_max_entries > 0:
+                self.embeddings = CachedEmbeddings(
+                    self.embeddings,
+                    EmbeddingCache(
+                        path=settings.embedding_cache_path,
+                        model_name=embedding_model_key(),
+                        max_entries=settings.embedding_cache_max_entries,
+                    ),
+                )
+        self.chunker = CodeChunker(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            strategy=chunk_strategy,
+        )
 
     def _should_skip_path(self, path: Path) -> bool:
         for part in path.parts:
@@ -112,91 +202,464 @@ class CodebaseIndexer:
 
         return False
 
-    def _extract_module_name(self, file_path: Path, codebase_root: Path) -> str:
-        try:
-            relative_path = file_path.relative_to(codebase_root)
-            parts = relative_path.parts
-
-            if len(parts) >= 2:
-                if parts[0] in ("core", "feature", "third", "build-logic"):
-                    return f"{parts[0]}:{parts[1]}"
-                elif parts[0] == "app":
-                    return "app"
-                elif parts[0] == "buildSrc":
-                    return "buildSrc"
-
-            return parts[0] if parts else "root"
-        except ValueError:
-            return "unknown"
+    def _is_indexable(self, file_path: Path) -> bool:
+        if self._should_skip_path(file_path):
+            return False
+        return file_path.suffix.lower() in self.INDEXABLE_EXTENSIONS
 
-    def _iter_files(self, codebase_path: Path) -> Iterator[Path]:
-        for file_path in codebase_path.rglob("*"):
-            if not file_path.is_file():
-                continue
-            if self._should_skip_path(file_path):
+    def _file_walker(self, codebase_path: Path) -> FileWalker:
+        return FileWalker(
+            root=codebase_path,
+            skip_dirs=self.SKIP_DIRS,
+            extensions=self.INDEXABLE_EXTENSIONS.keys(),
+            skip_suffixes=self.SKIP_PATTERNS,
+            extra_ignore_file=self.ignore_file,
+        )
+
+    def _changed_candidates(
+        self,
+        codebase_path: Path,
+        changed_paths: Iterable[str],
+        manifest: IndexManifest,
+        walker: FileWalker,
+    ) -> Tuple[List[Path], Set[str]]:
+        candidates = []
+        removed = set()
+        for relative_path in sorted(set(changed_paths)):
+            file_path = codebase_path / relative_path
+            # Skip rules apply below the codebase root, never to the directories above it
+            if file_path.is_file():
+                if self._is_indexable(Path(relative_path)) and not walker.is_ignored(relative_path):
+                    candidates.append(file_path)
+                elif relative_path in manifest.files:
+                    removed.add(relative_path)
                 continue
-            if file_path.suffix.lower() in self.INDEXABLE_EXTENSIONS:
-                yield file_path
 
-    def _read_file_safe(self, file_path: Path) -> Optional[str]:
-        try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                return f.read()
-        except Exception as e:
-            print(f"[SKIP] Failed to read {file_path}: {e}")
-            logger.warning(f"Failed to read {file_path}: {e}")
-            return None
+            # A deleted, renamed or moved-in directory is reported as a single path
+            prefix = relative_path.rstrip("/") + "/"
+            indexed = {
+                path for path in manifest.files if path == relative_path or path.startswith(prefix)
+            }
+            if file_path.is_dir():
+                found = []
+                if not self._should_skip_path(Path(relative_path)) and not walker.is_ignored(
+                    relative_path, is_dir=True
+                ):
+                    found = list(walker.walk(relative_path))
+                candidates.extend(found)
+                indexed -= {self._relative_path(path, codebase_path) for path in found}
+            removed.update(indexed)
+        return candidates, removed
 
-    def _chunk_file(
+    def _select_candidates(
         self,
-        content: str,
-        file_path: Path,
-        codebase_root: Path,
-    ) -> List[Document]:
-        suffix = file_path.suffix.lower()
-        file_type, language = self.INDEXABLE_EXTENSIONS.get(
-            suffix, ("unknown", "unknown")
+        codebase_path: Path,
+        manifest: IndexManifest,
+        walker: FileWalker,
+        since: Optional[str],
+        changed_paths: Optional[Iterable[str]],
+        full_rebuild: bool,
+    ) -> Tuple[Iterable[Path], Set[str], Optional[Iterable[str]]]:
+        """Files to read, paths known to be removed, and the changed paths (None for a full walk)."""
+        if since == "last":
+            since = manifest.meta.get("last_commit")
+            if since is None:
+                print("[WARN] No last indexed commit recorded, walking the full tree")
+                logger.warning("No last indexed commit recorded, walking the full tree")
+        if since is not None and full_rebuild:
+            print("[WARN] --since needs an existing manifest, walking the full tree")
+            logger.warning("--since needs an existing manifest, walking the full tree")
+            since = None
+
+        if changed_paths is None and since is not None:
+            changes = collect_git_changes(codebase_path, since)
+            if changes is None:
+                print(f"[WARN] Unknown commit {since[:12]}, walking the full tree")
+                logger.warning(f"Unknown commit {since[:12]}, walking the full tree")
+            else:
+                changed_paths = changes.changed + changes.deleted
+                print(f"[GIT] {len(changes.changed)} changed files since {since[:12]}")
+
+        if changed_paths is None:
+            return walker.walk(), set(), None
+        candidates, removed_paths = self._changed_candidates(
+            codebase_path, changed_paths, manifest, walker
         )
+        return candidates, removed_paths, changed_paths
+
+    def _scan_changes(
+        self,
+        codebase_path: Path,
+        active: IndexVersion,
+        since: Optional[str],
+        changed_paths: Optional[Iterable[str]],
+    ) -> Optional[ChangeScan]:
+        """Compare the tree with the live version's manifest, without copying the version.
+
+        Incremental builds copy the live version before writing to it, so
+        finding out first that nothing changed saves that copy entirely, and
+        the build itself then only visits the paths found here. Returns None
+        when every file has to be re-chunked anyway.
+        """
+        manifest = IndexManifest.load(self._manifest_path(active.path))
+        if not manifest.exists() or manifest.meta.get("chunker") != self.chunker.fingerprint:
+            return None
 
+        walker = self._file_walker(codebase_path)
+        candidates, removed_paths, changed_paths = self._select_candidates(
+            codebase_path,
+            manifest,
+            walker,
+            since=since,
+            changed_paths=changed_paths,
+            full_rebuild=False,
+        )
+        changed = set(removed_paths)
+        seen = set()
+        for file_path in candidates:
+            relative_path = self._relative_path(file_path, codebase_path)
+            seen.add(relative_path)
+            content = read_file_safe(file_path)
+            if content is None or not content.strip():
+                # The build drops unreadable and emptied files from the index
+                if relative_path in manifest.files:
+                    changed.add(relative_path)
+            elif hash_content(content) != manifest.get_hash(relative_path):
+                changed.add(relative_path)
+        if changed_paths is None:
+            changed.update(path for path in manifest.files if path not in seen)
+        return ChangeScan(paths=sorted(changed), walker=walker, manifest=manifest)
+
+    def _relative_path(self, file_path: Path, codebase_root: Path) -> str:
         try:
-            relative_path = str(file_path.relative_to(codebase_root))
+            return str(file_path.relative_to(codebase_root))
         except ValueError:
-            relative_path = str(file_path)
-
-        module_name = self._extract_module_name(file_path, codebase_root)
-        splitter = self._get_splitter(file_type)
-        chunks = splitter.split_text(content)
-
-        documents = []
-        for idx, chunk in enumerate(chunks):
-            metadata = {
-                "file_path": relative_path,
-                "module_name": module_name,
-                "file_type": file_type,
-                "language": language,
-                "chunk_index": idx,
-            }
-            documents.append(Document(page_content=chunk, metadata=metadata))
+            return str(file_path)
+
+    def _init_vectorstore(self, persist_dir: Path) -> Chroma:
+        persist_dir.mkdir(parents=True, exist_ok=True)
+
+        return open_vectorstore(persist_dir, self.collection_name, self.embeddings)
 
-        return documents
+    def _validate(self, vectorstore: Chroma, manifest: IndexManifest) -> None:
+        collection = vectorstore._collection
+        expected = sum(len(entry["chunk_ids"]) for entry in manifest.files.values())
+        count = collection.count()
+        if count < expected:
+            raise RuntimeError(
+                f"Index validation failed: {count} chunks stored, {expected} expected"
+            )
+        if count:
+            with self._model_lock:
+                probe = self.embeddings.embed_query("validate index")
+            collection.query(query_embeddings=[probe], n_results=1)
 
-    def _init_vectorstore(self, reset: bool = False) -> Chroma:
-        persist_dir = str(settings.chroma_db_path)
+    def _export_quantized(
+        self,
+        vectorstore: Chroma,
+        target: IndexVersion,
+        build: IndexBuild,
+        full: bool,
+    ) -> Optional[Dict]:
+        path = quantized_index_path(target.path, self.collection_name)
+        if settings.vector_quantization == "none":
+            # Drop a stale copy inherited from a version built with quantization on
+            QuantizedIndex.remove(path)
+            return None
+
+        report = None
+        if not full:
+            live_ids = [
+                chunk_id for entry in build.manifest.files.values() for chunk_id in entry["chunk_ids"]
+            ]
+            report = update_quantized_index(
+                vectorstore._collection,
+                path,
+                settings.vector_quantization,
+                live_ids,
+                build.written_ids,
+            )
+            if report is not None and report["vectors"]:
+                print(
+                    f"[QUANTIZE] Updated {report.get('vectors_updated', 0)} of {report['vectors']} "
+                    f"{report['kind']} vectors (recall is measured on full builds)"
+                )
+        if report is None:
+            report = export_quantized_index(
+                vectorstore._collection,
+                path,
+                settings.vector_quantization,
+                rescore_factor=settings.quantization_rescore_factor,
+            )
+            if report["vectors"]:
+                print(
+                    f"[QUANTIZE] {report['vectors']} vectors as {report['kind']} "
+                    f"({report['compression']}x smaller), recall@{report['k']}: "
+                    f"{report['recall_first_pass']} first pass, {report['recall_rescored']} rescored"
+                )
+        return report
+
+    def _open_side_indexes(self, build: IndexBuild, persist_dir: Path) -> List[ChunkIndex]:
+        indexes: List[ChunkIndex] = [
+            SymbolIndex.load(SymbolIndex.path_for(persist_dir, self.collection_name)),
+        ]
+        lexical_path = LexicalIndex.path_for(persist_dir, self.collection_name)
+        if settings.hybrid_search:
+            indexes.append(LexicalIndex.load(lexical_path))
+        else:
+            # A copy that stops being maintained would silently go stale
+            lexical_path.unlink(missing_ok=True)
+        collection = build.vectorstore._collection
+        for index in indexes:
+            # Versions built before the index (or its current format) existed
+            # are backfilled once. Legacy collections are skipped: every file
+            # is rewritten anyway.
+            if (not index.exists() or index.stale) and not build.legacy_collection and collection.count():
+                count = index.rebuild(collection)
+                print(f"[INDEX] Built {index.NAME} index from {count} stored chunks")
+                logger.info(f"Built {index.NAME} index from {count} stored chunks")
+        return indexes
+
+    def _manifest_path(self, persist_dir: Path) -> Path:
+        return persist_dir / f"{self.collection_name}.manifest.json"
+
+    def _read_tasks(
+        self,
+        build: IndexBuild,
+        file_paths: Iterable[Path],
+    ) -> Iterator[ReadTask]:
+        codebase_root = str(build.codebase_path)
+        for file_path in file_paths:
+            relative_path = self._relative_path(file_path, build.codebase_path)
+            # When re-chunking everything, files already rewritten before a
+            # resumed build was interrupted can still be skipped by hash.
+            rechunk = build.rechunk_all and relative_path not in build.written_paths
+            yield ReadTask(
+                file_path=str(file_path),
+                codebase_root=codebase_root,
+                relative_path=relative_path,
+                previous_hash=None if rechunk else build.manifest.get_hash(relative_path),
+            )
 
-        if reset:
-            import shutil
+    def _read_and_chunk_stage(
+        self,
+        build: IndexBuild,
+        file_paths: Iterable[Path],
+    ) -> Iterator[FileChunks]:
+        tasks = self._read_tasks(build, file_paths)
+        for result in process_files(self.chunker, tasks, workers=self.workers):
+            relative_path = result.relative_path
+            if build.profiler is not None:
+                build.profiler.add("read", result.read_seconds, files=1)
+                if result.chunks:
+                    build.profiler.add(
+                        "split", result.split_seconds, files=1, chunks=len(result.chunks)
+                    )
+                    build.profiler.record_file(
+                        relative_path,
+                        result.size,
+                        result.read_seconds,
+                        result.split_seconds,
+                        len(result.chunks),
+                    )
+            if result.chunks is None:
+                build.files_skipped += 1
+                build.skipped_paths.add(relative_path)
+                continue
+
+            build.seen_paths.add(relative_path)
+            if not result.chunks:
+                continue
+
+            previous_hash = build.manifest.get_hash(relative_path)
+            if previous_hash is None:
+                build.files_added += 1
+            else:
+                build.files_updated += 1
+
+            build.files_processed += 1
+            build.chunks_created += len(result.chunks)
+
+            if build.files_processed % 50 == 0:
+                print(
+                    f"[PROGRESS] Processed {build.files_processed} files, "
+                    f"{build.chunks_created} chunks"
+                )
+                logger.info(
+                    f"Processed {build.files_processed} files, "
+                    f"{build.chunks_created} chunks so far"
+                )
+
+            yield FileChunks(
+                relative_path=relative_path,
+                content_hash=result.content_hash,
+                chunks=result.chunks,
+                chunk_ids=[
+                    make_chunk_id(relative_path, idx) for idx in range(len(result.chunks))
+                ],
+                previous_chunk_ids=build.manifest.get_chunk_ids(relative_path),
+                is_new=previous_hash is None,
+            )
+
+    def _embed_texts(self, build: IndexBuild, batches: List[WriteBatch]) -> None:
+        """Embed the chunks of several write batches, planned as one set of forward passes."""
+        ids = [chunk_id for batch in batches for chunk_id in batch.ids]
+        texts = [text for batch in batches for text in batch.texts]
+        metadatas = [metadata for batch in batches for metadata in batch.metadatas]
+        started = time.perf_counter()
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        with self._model_lock:
+            lengths = self._token_lengths(texts)
+            if isinstance(self.embeddings, CachedEmbeddings):
+                # Cache hits skip the model, so they are left out of the plan
+                # and of the throughput below
+                for i, vector in self.embeddings.cached(texts).items():
+                    vectors[i] = vector
+            # Positions of each text still to embed; repeated chunks are embedded once
+            missing: Dict[str, List[int]] = {}
+            for i, text in enumerate(texts):
+                if vectors[i] is None:
+                    missing.setdefault(text, []).append(i)
+            positions = list(missing.values())
+            miss_lengths = [lengths[indices[0]] for indices in positions]
+            planned = plan_batches(miss_lengths, self.token_budget, self.MAX_EMBED_BATCH)
+            for rows in planned:
+                embedded = self.embeddings.embed_documents([texts[positions[row][0]] for row in rows])
+                for row, vector in zip(rows, embedded):
+                    for i in positions[row]:
+                        vectors[i] = vector
+        elapsed = time.perf_counter() - started
+        build.embedding_seconds += elapsed
+        build.chunks_embedded += len(positions)
+        build.tokens_embedded += sum(miss_lengths)
+        build.tokens_padded += padded_tokens(miss_lengths, planned)
+        if build.profiler is not None:
+            build.profiler.add("embed", elapsed, chunks=len(positions), tokens=sum(miss_lengths))
+            build.profiler.record_chunks(ids, texts, metadatas, lengths)
+
+        offset = 0
+        for batch in batches:
+            batch.embeddings = vectors[offset : offset + len(batch.ids)]
+            offset += len(batch.ids)
+
+    def _embed_stage(
+        self,
+        build: IndexBuild,
+        files: Iterable[FileChunks],
+    ) -> Iterator[WriteBatch]:
+        # Write batches wait here until EMBED_WINDOW chunks are pending, then
+        # are embedded together and passed on unchanged, in order
+        pending: List[WriteBatch] = []
+        pending_chunks = 0
 
-            chroma_path = Path(persist_dir)
-            if chroma_path.exists():
-                logger.info(f"Resetting vector store at {persist_dir}")
-                shutil.rmtree(chroma_path)
+        def flush() -> Iterator[WriteBatch]:
+            nonlocal pending, pending_chunks
+            if pending_chunks:
+                self._embed_texts(build, pending)
+            yield from pending
+            pending, pending_chunks = [], 0
 
-        Path(persist_dir).mkdir(parents=True, exist_ok=True)
+        batch = WriteBatch()
+        for file_chunks in files:
+            batch.delete_ids.extend(file_chunks.previous_chunk_ids)
+            if file_chunks.is_new and build.legacy_collection:
+                batch.delete_paths.append(file_chunks.relative_path)
 
-        return Chroma(
-            collection_name=self.COLLECTION_NAME,
-            embedding_function=self.embeddings,
-            persist_directory=persist_dir,
+            for chunk_id, chunk in zip(file_chunks.chunk_ids, file_chunks.chunks):
+                batch.ids.append(chunk_id)
+                batch.texts.append(chunk.text)
+                batch.metadatas.append(chunk.metadata)
+                if len(batch.ids) >= build.batch_size:
+                    pending.append(batch)
+                    pending_chunks += len(batch.ids)
+                    batch = WriteBatch()
+                    if pending_chunks >= max(self.EMBED_WINDOW, build.batch_size):
+                        yield from flush()
+
+            # Every chunk of the file is in this batch or an earlier one, so the
+            # file is fully written once this batch is.
+            batch.completed_files.append(file_chunks)
+
+        if batch.ids or batch.delete_ids or batch.completed_files:
+            pending.append(batch)
+            pending_chunks += len(batch.ids)
+        yield from flush()
+
+    def _write_stage(
+        self,
+        build: IndexBuild,
+        batches: Iterable[WriteBatch],
+    ) -> Iterator[int]:
+        collection = build.vectorstore._collection
+        for batch in batches:
+            started = time.perf_counter()
+            if batch.delete_ids:
+                collection.delete(ids=batch.delete_ids)
+            for relative_path in batch.delete_paths:
+                collection.delete(where={"file_path": relative_path})
+            if batch.ids:
+                collection.upsert(
+                    ids=batch.ids,
+                    embeddings=batch.embeddings,
+                    metadatas=batch.metadatas,
+                    documents=batch.texts,
+                )
+            for index in build.side_indexes:
+                index.remove(batch.delete_ids)
+                index.add(batch.ids, batch.texts, batch.metadatas)
+            build.written_ids.update(batch.ids)
+            for file_chunks in batch.completed_files:
+                build.manifest.set_file(
+                    file_chunks.relative_path,
+                    file_chunks.content_hash,
+                    file_chunks.chunk_ids,
+                )
+                build.written_paths.add(file_chunks.relative_path)
+            if build.profiler is not None:
+                build.profiler.add(
+                    "write",
+                    time.perf_counter() - started,
+                    files=len(batch.completed_files),
+                    chunks=len(batch.ids),
+                )
+
+            build.batches_written += 1
+            build.chunks_written += len(batch.ids)
+            if build.checkpoint_every > 0 and build.batches_written % build.checkpoint_every == 0:
+                self._checkpoint(build)
+            print(
+                f"[BATCH] Added batch {build.batches_written} "
+                f"({build.chunks_written}/{build.chunks_created} chunks)"
+            )
+            logger.info(
+                f"Added batch {build.batches_written} "
+                f"({build.chunks_written}/{build.chunks_created} chunks)"
+            )
+            yield build.batches_written
+
+    def _checkpoint(self, build: IndexBuild) -> None:
+        """Persist the manifest so far; it only lists files already written to Chroma."""
+        if not build.rechunk_all:
+            # Every entry was produced by the current chunker. While re-chunking,
+            # the old fingerprint stays so a resumed build keeps re-chunking.
+            build.manifest.meta["chunker"] = self.chunker.fingerprint
+        build.manifest.meta["checkpoint"] = {
+            "batches_written": build.batches_written,
+            "chunks_written": build.chunks_written,
+            "rechunked": sorted(build.written_paths) if build.rechunk_all else [],
+            "saved_at": time.time(),
+        }
+        for index in build.side_indexes:
+            index.save()
+        build.manifest.save()
+        build.checkpoints_saved += 1
+        print(
+            f"[CHECKPOINT] Saved after batch {build.batches_written} "
+            f"({len(build.written_paths)} files written)"
+        )
+        logger.info(
+            f"Checkpoint saved after batch {build.batches_written} "
+            f"({len(build.written_paths)} files written)"
         )
 
     def index_codebase(
@@ -204,6 +667,12 @@ class CodebaseIndexer:
         codebase_path: Union[str, Path],
         reset: bool = False,
         batch_size: int = 100,
+        since: Optional[str] = None,
+        changed_paths: Optional[Iterable[str]] = None,
+        queue_size: int = 8,
+        checkpoint_every: int = 10,
+        resume: bool = False,
+        profile_path: Optional[Union[str, Path]] = None,
     ) -> Dict:
         codebase_path = Path(codebase_path)
         if not codebase_path.exists():
@@ -211,65 +680,388 @@ class CodebaseIndexer:
 
         logger.info(f"Starting indexing of {codebase_path}")
         print(f"[START] Indexing codebase: {codebase_path}")
+        profiler = BuildProfiler() if profile_path is not None else None
 
-        vectorstore = self._init_vectorstore(reset=reset)
+        # Build into a side directory and only swap the live pointer once the
+        # new index is complete and validated.
+        versions = IndexVersions(settings.chroma_db_path, self.collection_name)
+        with versions.build_lock():
+            active = versions.active()
+            interrupted = versions.building()
+            resumed = resume and interrupted is not None
+            walker: Optional[FileWalker] = None
+            if resumed:
+                target = interrupted
+                # Whatever reset cleared was cleared before the interruption
+                reset = False
+                print(f"[RESUME] Resuming index version {target.version} (live: {active.version})")
+                logger.info(f"Resuming index version {target.version} (live: {active.version})")
+            else:
+                if resume:
+                    print("[WARN] No interrupted build to resume, starting a new one")
+                    logger.warning("No interrupted build to resume, starting a new one")
+                elif interrupted is not None:
+                    logger.info(f"Discarding interrupted build {interrupted.version}")
+                    versions.discard(interrupted)
+                scan = None
+                if not reset and active.version != LEGACY_VERSION:
+                    scan = self._scan_changes(codebase_path, active, since, changed_paths)
+                if scan is not None:
+                    if not scan.paths:
+                        self._advance_last_commit(codebase_path, scan.manifest)
+                        stats = self._unchanged_stats(active, scan)
+                        print(f"[VERSION] No changes, index version {active.version} stays live")
+                        return self._finish(stats, profiler, profile_path, active)
+                    # The build only needs to visit what the scan found
+                    changed_paths, since, walker = scan.paths, None, scan.walker
+                    print(f"[SCAN] {len(scan.paths)} changed paths, copying live version {active.version}")
+                target = versions.create(copy_from=None if reset else active.path)
+                versions.mark_building(target)
+                print(f"[VERSION] Building index version {target.version} (live: {active.version})")
+                logger.info(f"Building index version {target.version} (live: {active.version})")
 
-        all_documents: List[Document] = []
-        files_processed = 0
-        files_skipped = 0
+            vectorstore = self._init_vectorstore(target.path)
+            try:
+                stats = self._build_version(
+                    target,
+                    vectorstore,
+                    codebase_path,
+                    reset=reset,
+                    batch_size=batch_size,
+                    since=since,
+                    changed_paths=changed_paths,
+                    queue_size=queue_size,
+                    checkpoint_every=checkpoint_every,
+                    resumed=resumed,
+                    profiler=profiler,
+                    walker=walker,
+                )
+            except BaseException:
+                close_vectorstore(vectorstore)
+                if checkpoint_every > 0:
+                    # Keep the partial version; --resume continues from its checkpoint
+                    print(f"[CHECKPOINT] Build interrupted, rerun with --resume to continue {target.version}")
+                    logger.error(f"Build interrupted, rerun with --resume to continue {target.version}")
+                else:
+                    versions.discard(target)
+                raise
+            # --watch builds a version per burst; each client must go with it,
+            # and before a discard or prune removes its files
+            close_vectorstore(vectorstore)
 
-        for file_path in self._iter_files(codebase_path):
-            content = self._read_file_safe(file_path)
-            if content is None:
-                files_skipped += 1
-                continue
+            unchanged = (
+                not resumed
+                and not reset
+                and active.version != LEGACY_VERSION
+                and stats["files_processed"] == 0
+                and stats["files_deleted"] == 0
+            )
+            if unchanged:
+                versions.discard(target)
+                stats["index_version"] = active.version
+                stats["persist_directory"] = str(active.path)
+                print(f"[VERSION] No changes, index version {active.version} stays live")
+            else:
+                versions.promote(target)
+                versions.prune(keep=settings.index_keep_versions)
+                print(f"[PROMOTE] Index version {target.version} is live")
 
-            if not content.strip():
-                files_skipped += 1
-                continue
+            return self._finish(stats, profiler, profile_path, target)
 
-            chunks = self._chunk_file(content, file_path, codebase_path)
-            all_documents.extend(chunks)
-            files_processed += 1
+    def _finish(
+        self,
+        stats: Dict,
+        profiler: Optional[BuildProfiler],
+        profile_path: Optional[Union[str, Path]],
+        version: IndexVersion,
+    ) -> Dict:
+        if profiler is not None:
+            report_path = Path(profile_path)
+            if report_path.suffix != ".json":
+                report_path = report_path / f"{self.collection_name}-{version.version}.json"
+            stats["profile_report"] = str(report_path)
+            profiler.write(report_path, stats)
+            for line in profiler.summary_lines():
+                print(f"[PROFILE] {line}")
+            print(f"[PROFILE] Report written to {report_path}")
 
-            if files_processed % 50 == 0:
-                print(
-                    f"[PROGRESS] Processed {files_processed} files, "
-                    f"{len(all_documents)} chunks"
-                )
-                logger.info(
-                    f"Processed {files_processed} files, "
-                    f"{len(all_documents)} chunks so far"
-                )
+        print(f"[DONE] Indexing complete: {stats}")
+        logger.info(f"Indexing complete: {stats}")
+        return stats
+
+    def _advance_last_commit(self, codebase_path: Path, manifest: IndexManifest) -> None:
+        """Record HEAD in the live manifest after a build that found nothing to index.
+
+        Commits touching only ignored or non-indexed files change nothing,
+        but without this every later `--since` would diff from the old commit.
+        The manifest is replaced atomically, and the build lock keeps other
+        builds out.
+        """
+        head_commit = get_head_commit(codebase_path)
+        if head_commit is None or head_commit == manifest.meta.get("last_commit"):
+            return
+        manifest.meta["last_commit"] = head_commit
+        manifest.save()
+        logger.info(f"No indexable changes up to {head_commit[:12]}, recorded it as the last indexed commit")
+
+    def _unchanged_stats(self, active: IndexVersion, scan: ChangeScan) -> Dict:
+        return {
+            "files_processed": 0,
+            "files_skipped": 0,
+            "files_added": 0,
+            "files_updated": 0,
+            "files_deleted": 0,
+            "files_unchanged": len(scan.manifest.files),
+            "last_commit": scan.manifest.meta.get("last_commit"),
+            "chunks_created": 0,
+            "walk_seconds": round(scan.walker.elapsed, 2),
+            "embedding_cache_hits": 0,
+            "embedding_seconds": 0.0,
+            "chunks_per_second": 0.0,
+            "embedding_padding_ratio": 1.0,
+            "quantization": None,
+            "chunk_indexes": {},
+            "checkpoints_saved": 0,
+            "resumed": False,
+            "collection_name": self.collection_name,
+            "index_version": active.version,
+            "persist_directory": str(active.path),
+        }
+
+    def _build_version(
+        self,
+        target: IndexVersion,
+        vectorstore: Chroma,
+        codebase_path: Path,
+        reset: bool,
+        batch_size: int,
+        since: Optional[str],
+        changed_paths: Optional[Iterable[str]],
+        queue_size: int,
+        checkpoint_every: int,
+        resumed: bool,
+        profiler: Optional[BuildProfiler] = None,
+        walker: Optional[FileWalker] = None,
+    ) -> Dict:
+        # The indexer outlives one build in --watch mode; report this build's hits only
+        cache_hits_before = getattr(self.embeddings, "hits", 0)
+        manifest = IndexManifest.load(self._manifest_path(target.path))
+        build = IndexBuild(
+            codebase_path=codebase_path,
+            vectorstore=vectorstore,
+            manifest=manifest,
+            batch_size=batch_size,
+            # Collections built before the manifest existed have random chunk
+            # IDs, so stale chunks of re-indexed files are removed by file path.
+            legacy_collection=not manifest.exists() and not reset,
+            checkpoint_every=checkpoint_every,
+            profiler=profiler,
+        )
+        build.side_indexes = self._open_side_indexes(build, target.path)
+
+        checkpoint = manifest.meta.pop("checkpoint", None)
+        if resumed and checkpoint:
+            build.written_paths.update(checkpoint.get("rechunked", []))
+            print(
+                f"[RESUME] Checkpoint has {len(manifest.files)} files "
+                f"({checkpoint['chunks_written']} chunks written before the interruption)"
+            )
+
+        if manifest.files and manifest.meta.get("chunker") != self.chunker.fingerprint:
+            print("[WARN] Chunking settings changed, re-chunking every file")
+            logger.warning("Chunking settings changed, re-chunking every file")
+            build.rechunk_all = True
+            since = None
+            changed_paths = None
+
+        walker = walker or self._file_walker(codebase_path)
+        candidates, removed_paths, changed_paths = self._select_candidates(
+            codebase_path,
+            manifest,
+            walker,
+            since=since,
+            changed_paths=changed_paths,
+            full_rebuild=reset or build.legacy_collection,
+        )
+
+        print("[EMBEDDING] Streaming changed files into the vector store...")
+        logger.info("Streaming changed files into the vector store...")
+        pipeline = StreamingPipeline(
+            source=candidates,
+            stages=[
+                ("read", lambda items: self._read_and_chunk_stage(build, items)),
+                ("embed", lambda items: self._embed_stage(build, items)),
+                ("write", lambda items: self._write_stage(build, items)),
+            ],
+            queue_size=queue_size,
+        )
+        try:
+            for _ in pipeline.run():
+                pass
+        except BaseException:
+            if checkpoint_every > 0 and build.batches_written % checkpoint_every:
+                self._checkpoint(build)
+            raise
+
+        finalize_started = time.perf_counter()
+        if changed_paths is not None:
+            deleted_paths = [
+                path
+                for path in removed_paths | build.skipped_paths
+                if path in manifest.files
+            ]
+        else:
+            deleted_paths = [
+                path for path in manifest.files if path not in build.seen_paths
+            ]
+        for relative_path in deleted_paths:
+            chunk_ids = manifest.remove_file(relative_path)
+            if chunk_ids:
+                vectorstore.delete(ids=chunk_ids)
+                for index in build.side_indexes:
+                    index.remove(chunk_ids)
+        files_unchanged = len(manifest.files) - build.files_updated - build.files_added
 
         print(
-            f"[COMPLETE] Read {files_processed} files, "
-            f"{len(all_documents)} chunks total"
+            f"[COMPLETE] Indexed {build.files_processed} changed files, "
+            f"{build.chunks_created} chunks total"
         )
         logger.info(
-            f"Finished reading: {files_processed} files, "
-            f"{len(all_documents)} chunks total"
+            f"Finished indexing: {build.files_processed} changed files, "
+            f"{build.chunks_created} chunks total"
         )
 
-        if all_documents:
-            print("[EMBEDDING] Adding documents to vector store...")
-            logger.info("Adding documents to vector store...")
-            for i in range(0, len(all_documents), batch_size):
-                batch = all_documents[i : i + batch_size]
-                vectorstore.add_documents(batch)
-                batch_num = i // batch_size + 1
-                total_batches = (len(all_documents) + batch_size - 1) // batch_size
-                print(f"[BATCH] Added batch {batch_num}/{total_batches}")
-                logger.info(f"Added batch {batch_num}/{total_batches}")
+        print(
+            f"[WALK] Found {walker.files_found} files in {walker.elapsed:.2f}s "
+            f"({walker.dirs_pruned} directories pruned)"
+        )
+        logger.info(
+            f"Walked {walker.files_found} files in {walker.elapsed:.2f}s "
+            f"({walker.dirs_pruned} directories pruned)"
+        )
+
+        chunks_per_second = (
+            build.chunks_embedded / build.embedding_seconds
+            if build.embedding_seconds > 0
+            else 0.0
+        )
+        # Computed tokens per real token; 1.0 means no compute spent on padding
+        padding_ratio = build.tokens_padded / build.tokens_embedded if build.tokens_embedded else 1.0
+        print(
+            f"[EMBEDDING] {build.chunks_embedded} chunks in "
+            f"{build.embedding_seconds:.1f}s ({chunks_per_second:.1f} chunks/s, "
+            f"padding ratio {padding_ratio:.2f}, device: {settings.embedding_device})"
+        )
+        logger.info(
+            f"Embedded {build.chunks_embedded} chunks in {build.embedding_seconds:.1f}s "
+            f"({chunks_per_second:.1f} chunks/s, padding ratio {padding_ratio:.2f}, "
+            f"device: {settings.embedding_device})"
+        )
+
+        head_commit = get_head_commit(codebase_path)
+        if head_commit is not None:
+            manifest.meta["last_commit"] = head_commit
+        manifest.meta["chunker"] = self.chunker.fingerprint
+        for index in build.side_indexes:
+            index.save()
+        manifest.save()
+        self._validate(vectorstore, manifest)
+        quantization = self._export_quantized(
+            vectorstore,
+            target,
+            build,
+            # A resumed build lost the ids written before the interruption
+            full=reset or resumed or build.legacy_collection or build.rechunk_all,
+        )
+        if profiler is not None:
+            profiler.add("walk", walker.elapsed, files=walker.files_found)
+            profiler.add(
+                "finalize",
+                time.perf_counter() - finalize_started,
+                files=len(deleted_paths),
+            )
 
         stats = {
-            "files_processed": files_processed,
-            "files_skipped": files_skipped,
-            "chunks_created": len(all_documents),
-            "collection_name": self.COLLECTION_NAME,
-            "persist_directory": str(settings.chroma_db_path),
+            "files_processed": build.files_processed,
+            "files_skipped": build.files_skipped,
+            "files_added": build.files_added,
+            "files_updated": build.files_updated,
+            "files_deleted": len(deleted_paths),
+            "files_unchanged": files_unchanged,
+            "last_commit": manifest.meta.get("last_commit"),
+            "chunks_created": build.chunks_created,
+            "walk_seconds": round(walker.elapsed, 2),
+            "embedding_cache_hits": getattr(self.embeddings, "hits", 0) - cache_hits_before,
+            "embedding_seconds": round(build.embedding_seconds, 2),
+            "chunks_per_second": round(chunks_per_second, 1),
+            "embedding_padding_ratio": round(padding_ratio, 3),
+            "quantization": quantization,
+            "chunk_indexes": {index.NAME: len(index) for index in build.side_indexes},
+            "checkpoints_saved": build.checkpoints_saved,
+            "resumed": resumed,
+            "collection_name": self.collection_name,
+            "index_version": target.version,
+            "persist_directory": str(target.path),
         }
-
-        print(f"[DONE] Indexing complete: {stats}")
-        logger.info(f"Indexing complete: {stats}")
         return stats
+
+
+def _shard_profile_path(
+    profile_path: Optional[Union[str, Path]], collection_name: str
+) -> Optional[Union[str, Path]]:
+    """Give each shard its own report when --profile names a single .json file."""
+    if profile_path is None or Path(profile_path).suffix != ".json":
+        return profile_path
+    path = Path(profile_path)
+    return path.with_name(f"{path.stem}.{collection_name}{path.suffix}")
+
+
+def index_shards(
+    shards: Dict[str, Path],
+    parallel: int = 2,
+    indexer_options: Optional[Dict] = None,
+    **index_options,
+) -> Dict[str, Dict]:
+    """Build one collection per codebase concurrently, sharing one embedding model.
+
+    While one shard holds the model, the others keep walking, chunking and
+    writing, so the GPU/CPU stays busy instead of idling between serial builds.
+    Returns the stats of every shard keyed by collection name; a failed shard
+    does not stop the others and is reported once all have finished.
+    """
+    indexer_options = indexer_options or {}
+    profile_path = index_options.pop("profile_path", None)
+    indexers: Dict[str, CodebaseIndexer] = {}
+    shared: Optional[CodebaseIndexer] = None
+    for collection_name in shards:
+        indexer = CodebaseIndexer(
+            collection_name=collection_name,
+            shared_from=shared,
+            **indexer_options,
+        )
+        shared = shared or indexer
+        indexers[collection_name] = indexer
+
+    results: Dict[str, Dict] = {}
+    failed: List[str] = []
+    with ThreadPoolExecutor(max_workers=max(parallel, 1), thread_name_prefix="shard") as executor:
+        futures = {
+            executor.submit(
+                indexers[name].index_codebase,
+                path,
+                profile_path=_shard_profile_path(profile_path, name),
+                **index_options,
+            ): name
+            for name, path in shards.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logger.exception(f"Building shard {name} failed: {e}")
+                failed.append(name)
+
+    if failed:
+        raise RuntimeError(f"Failed to build shards: {', '.join(sorted(failed))}")
+    return results
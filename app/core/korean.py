@@ -0,0 +1,55 @@
+"""Light-weight Korean text normalization for cache keys and glossary lookups.
+
+No morphological analyzer: particles and endings are stripped from the end of
+a word by suffix lists, keeping at least two syllables so short nouns
+(추가, 회사) are never cut.
+"""
+
+import re
+from typing import List, Tuple
+
+HANGUL_WORD = re.compile(r"[가-힣]+")
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+# Particles dropped from the end of a word, longest first
+PARTICLES = ("에서", "으로", "까지", "부터", "은", "는", "이", "가", "을", "를", "에", "의", "로", "와", "과", "도", "만")
+# Polite / interrogative sentence endings dropped from the last word
+ENDINGS = ("습니까", "인가요", "나요", "까요", "인지", "요")
+# Verb suffixes turning a noun into 하다/되다 verbs (저장하는, 결제된)
+VERB_SUFFIXES = (
+    "하는지", "하려면", "하는", "하기", "하다", "해서", "했을", "하면", "되는", "되면",
+    "해", "할", "한", "하", "된", "될", "돼", "되",
+)
+
+
+def strip_suffix(word: str, suffixes: Tuple[str, ...]) -> str:
+    for suffix in suffixes:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+            return word[: -len(suffix)]
+    return word
+
+
+def stem(word: str) -> str:
+    """Noun stem of a Korean word: ending, particle and 하다/되다 suffix removed."""
+    word = strip_suffix(word, ENDINGS)
+    word = strip_suffix(word, VERB_SUFFIXES)
+    word = strip_suffix(word, PARTICLES)
+    # 저장하기를 -> 저장하기 -> 저장
+    return strip_suffix(word, VERB_SUFFIXES)
+
+
+def korean_words(text: str) -> List[str]:
+    return HANGUL_WORD.findall(text)
+
+
+def normalize_query(query: str) -> str:
+    """Cache key form of a question: case, punctuation, spacing and trailing particles ignored.
+
+    "결제는 어디서 처리해요?" and "결제 어디서 처리해" normalize to the same key.
+    """
+    words = _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", query.lower())).split()
+    if not words:
+        return ""
+    words[-1] = strip_suffix(words[-1], ENDINGS)
+    return " ".join(strip_suffix(word, PARTICLES) for word in words)
@@ -0,0 +1,119 @@
+"""BM25 inverted index over the indexed chunks, for hybrid lexical + vector search.
+
+Dense vectors blur exact tokens such as string resource keys, event names and
+enum values; BM25 ranks them precisely. Identifiers are indexed both whole
+and split into their camelCase / snake_case parts, so `PaymentRepository`
+matches "payment repository" and vice versa.
+"""
+
+import heapq
+import math
+import re
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from app.core.chunk_index import ChunkIndex
+
+_TOKEN = re.compile(r"[A-Za-z0-9_]+|[가-힣]+")
+_WORD_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize(text: str) -> Iterator[str]:
+    for raw in _TOKEN.findall(text):
+        lowered = raw.lower()
+        if len(lowered) >= 2:
+            yield lowered
+        parts = [part.lower() for piece in raw.split("_") for part in _WORD_PART.findall(piece)]
+        if len(parts) > 1:
+            yield from (part for part in parts if len(part) >= 2)
+
+
+class LexicalIndex(ChunkIndex):
+    """Okapi BM25 over chunk text and file path.
+
+    Postings are parallel int arrays per term, keyed by an internal document
+    number. A re-indexed chunk gets a new number; postings of removed numbers
+    are skipped at query time and dropped when the index is saved.
+    """
+
+    NAME = "lexical"
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, path):
+        super().__init__(path)
+        # doc number -> (chunk id, token count)
+        self._docs: Dict[int, Tuple[str, int]] = {}
+        self._doc_of: Dict[str, int] = {}
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._next_doc = 0
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _restore(self, data: Dict) -> None:
+        for docno, (chunk_id, length) in enumerate(data.get("docs", [])):
+            self._docs[docno] = (chunk_id, length)
+            self._doc_of[chunk_id] = docno
+            self._total_length += length
+        self._next_doc = len(self._docs)
+        for term, (docnos, tfs) in data.get("postings", {}).items():
+            self._postings[term] = (array("i", docnos), array("i", tfs))
+
+    def _dump(self) -> Dict:
+        # Renumber live documents densely, dropping postings of removed ones
+        renumber = {docno: index for index, docno in enumerate(self._docs)}
+        postings = {}
+        for term, (docnos, tfs) in self._postings.items():
+            live = [(renumber[docno], tf) for docno, tf in zip(docnos, tfs) if docno in renumber]
+            if live:
+                postings[term] = [[docno for docno, _ in live], [tf for _, tf in live]]
+        return {"docs": [list(doc) for doc in self._docs.values()], "postings": postings}
+
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict]) -> None:
+        self.remove(ids)
+        for chunk_id, text, metadata in zip(ids, texts, metadatas):
+            counts = Counter(tokenize(text))
+            counts.update(tokenize(metadata.get("file_path") or ""))
+            length = sum(counts.values())
+            docno = self._next_doc
+            self._next_doc += 1
+            self._docs[docno] = (chunk_id, length)
+            self._doc_of[chunk_id] = docno
+            self._total_length += length
+            for term, tf in counts.items():
+                docnos, tfs = self._postings.setdefault(term, (array("i"), array("i")))
+                docnos.append(docno)
+                tfs.append(tf)
+
+    def remove(self, ids: Iterable[str]) -> None:
+        for chunk_id in ids:
+            docno = self._doc_of.pop(chunk_id, None)
+            if docno is not None:
+                _, length = self._docs.pop(docno)
+                self._total_length -= length
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Top `k` (chunk id, BM25 score) pairs, best first."""
+        count = len(self._docs)
+        if not count or k <= 0:
+            return []
+        average_length = self._total_length / count
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            docnos, tfs = postings
+            frequency = len(docnos)
+            idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for docno, tf in zip(docnos, tfs):
+                doc = self._docs.get(docno)
+                if doc is None:
+                    continue
+                norm = self.K1 * (1 - self.B + self.B * doc[1] / average_length)
+                scores[docno] = scores.get(docno, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self._docs[docno][0], score) for docno, score in top]
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def hash_content(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def make_chunk_id(relative_path: str, chunk_index: int) -> str:
+    digest = hashlib.sha1(relative_path.encode("utf-8")).hexdigest()[:16]
+    return f"{digest}:{chunk_index}"
+
+
+class IndexManifest:
+    """Persisted map of relative path -> content hash -> chunk IDs."""
+
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.files: Dict[str, Dict] = {}
+        self.meta: Dict = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "IndexManifest":
+        manifest = cls(path)
+        if not path.exists():
+            return manifest
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable manifest {path}: {e}")
+            return manifest
+
+        if data.get("version") != cls.VERSION:
+            logger.warning(f"Ignoring manifest {path} with unknown version")
+            return manifest
+
+        manifest.files = data.get("files", {})
+        manifest.meta = data.get("meta", {})
+        return manifest
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def get_hash(self, relative_path: str) -> Optional[str]:
+        entry = self.files.get(relative_path)
+        return entry["hash"] if entry else None
+
+    def get_chunk_ids(self, relative_path: str) -> List[str]:
+        entry = self.files.get(relative_path)
+        return list(entry["chunk_ids"]) if entry else []
+
+    def set_file(self, relative_path: str, content_hash: str, chunk_ids: List[str]) -> None:
+        self.files[relative_path] = {"hash": content_hash, "chunk_ids": chunk_ids}
+
+    def remove_file(self, relative_path: str) -> List[str]:
+        entry = self.files.pop(relative_path, None)
+        return list(entry["chunk_ids"]) if entry else []
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": self.VERSION, "meta": self.meta, "files": self.files},
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, self.path)
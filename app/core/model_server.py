@@ -0,0 +1,288 @@
+"""Embedding / reranking worker shared by every API worker over a Unix socket.
+
+Each uvicorn worker that builds `CodebaseSearch` otherwise loads its own copy
+of the embedding model and the reranker. With MODEL_SERVER_SOCKET set, the
+workers use the thin clients below and a single `scripts/model_server.py`
+process owns the models, micro-batching embedding requests from all workers
+into shared forward passes.
+
+Messages are length-prefixed JSON: a 4-byte big-endian length, then the body.
+"""
+
+import asyncio
+import json
+import logging
+import socket
+import struct
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from flashrank import RerankRequest
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+
+
+class ModelServerError(RuntimeError):
+    pass
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    body = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    return _HEADER.pack(len(body)) + body
+
+
+def _check_length(length: int) -> int:
+    if length > MAX_MESSAGE_BYTES:
+        raise ModelServerError(f"Message of {length} bytes exceeds {MAX_MESSAGE_BYTES}")
+    return length
+
+
+async def _read_message(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    try:
+        header = await reader.readexactly(_HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+    (length,) = _HEADER.unpack(header)
+    return json.loads(await reader.readexactly(_check_length(length)))
+
+
+class ModelServer:
+    """Serves `embed` and `rerank` requests from one set of loaded models.
+
+    Embedding requests that arrive within `max_wait_ms` of each other are
+    concatenated into one `embed_documents` call of up to `max_batch` texts.
+    Rerank requests queued at the same time are scored in one worker-thread
+    hop, one cross-encoder call per query.
+    """
+
+    def __init__(
+        self,
+        socket_path: Path,
+        embeddings: Embeddings,
+        reranker,
+        max_batch: int = 64,
+        max_wait_ms: float = 5.0,
+    ):
+        self.socket_path = socket_path
+        self.embeddings = embeddings
+        self.reranker = reranker
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.stats: Counter = Counter()
+        self._embed_queue: Optional[asyncio.Queue] = None
+        self._rerank_queue: Optional[asyncio.Queue] = None
+
+    async def serve_forever(self) -> None:
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        # A socket file left behind by a killed server would make bind fail
+        self.socket_path.unlink(missing_ok=True)
+        self._embed_queue = asyncio.Queue()
+        self._rerank_queue = asyncio.Queue()
+        server = await asyncio.start_unix_server(self._handle, path=str(self.socket_path))
+        batchers = [
+            asyncio.create_task(self._embed_batcher()),
+            asyncio.create_task(self._rerank_batcher()),
+        ]
+        logger.info(
+            f"Model server listening on {self.socket_path} "
+            f"(max_batch={self.max_batch}, max_wait={self.max_wait * 1000:.1f}ms)"
+        )
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in batchers:
+                task.cancel()
+            self.socket_path.unlink(missing_ok=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await _read_message(reader)
+                if request is None:
+                    break
+                try:
+                    response = await self._dispatch(request)
+                except Exception as e:
+                    logger.exception(f"Model server request failed: {e}")
+                    response = {"error": f"{type(e).__name__}: {e}"}
+                writer.write(_encode(response))
+                await writer.drain()
+        except (ConnectionError, ModelServerError, ValueError) as e:
+            logger.warning(f"Dropping model server connection: {e}")
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op")
+        if op == "embed":
+            future = asyncio.get_running_loop().create_future()
+            await self._embed_queue.put((request["texts"], future))
+            return {"vectors": await future}
+        if op == "rerank":
+            future = asyncio.get_running_loop().create_future()
+            await self._rerank_queue.put((request["query"], request["passages"], future))
+            return {"scores": await future}
+        if op == "ping":
+            return {"status": "ok", **self.stats}
+        raise ValueError(f"Unknown op: {op}")
+
+    async def _embed_batcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._embed_queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._embed_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            texts = [text for texts, _ in batch for text in texts]
+            try:
+                vectors = await asyncio.to_thread(self.embeddings.embed_documents, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            offset = 0
+            for item_texts, future in batch:
+                if not future.done():
+                    future.set_result(
+                        [[float(x) for x in vector] for vector in vectors[offset : offset + len(item_texts)]]
+                    )
+                offset += len(item_texts)
+            self.stats["embed_batches"] += 1
+            self.stats["embed_requests"] += len(batch)
+            self.stats["embed_texts"] += len(texts)
+
+    async def _rerank_batcher(self) -> None:
+        while True:
+            batch = [await self._rerank_queue.get()]
+            while not self._rerank_queue.empty():
+                batch.append(self._rerank_queue.get_nowait())
+            try:
+                results = await asyncio.to_thread(self._rerank_all, batch)
+            except Exception as e:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (*_, future), scores in zip(batch, results):
+                if not future.done():
+                    future.set_result(scores)
+            self.stats["rerank_batches"] += 1
+            self.stats["rerank_requests"] += len(batch)
+
+    def _rerank_all(self, batch: List[Tuple[str, List[Dict], asyncio.Future]]) -> List[List[float]]:
+        results = []
+        for query, passages, _ in batch:
+            scored = {
+                item["id"]: float(item["score"])
+                for item in self.reranker.rerank(RerankRequest(query=query, passages=passages))
+            }
+            results.append([scored[passage["id"]] for passage in passages])
+        return results
+
+
+class ModelClient:
+    """Blocking client with one persistent connection per thread."""
+
+    def __init__(self, socket_path: Path, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(str(self.socket_path))
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _close(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _receive(self, sock: socket.socket, size: int) -> bytes:
+        chunks = []
+        while size:
+            chunk = sock.recv(min(size, 1 << 20))
+            if not chunk:
+                raise ConnectionError("Model server closed the connection")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # Every op is idempotent, so a call on a dropped connection is retried once
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                sock.sendall(_encode(request))
+                (length,) = _HEADER.unpack(self._receive(sock, _HEADER.size))
+                response = json.loads(self._receive(sock, _check_length(length)))
+                break
+            except (OSError, ValueError) as e:
+                self._close()
+                if attempt:
+                    raise ModelServerError(f"Model server at {self.socket_path} unavailable: {e}") from e
+        if "error" in response:
+            raise ModelServerError(response["error"])
+        return response
+
+    def ping(self) -> Dict[str, Any]:
+        return self.call({"op": "ping"})
+
+
+class RemoteEmbeddings(Embeddings):
+    """LangChain embeddings computed by the model server."""
+
+    def __init__(self, client: ModelClient):
+        self.client = client
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self.client.call({"op": "embed", "texts": list(texts)})["vectors"]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class RemoteRanker:
+    """Drop-in for `flashrank.Ranker.rerank` backed by the model server."""
+
+    def __init__(self, client: ModelClient):
+        self.client = client
+
+    def rerank(self, request) -> List[Dict[str, Any]]:
+        passages = [{"id": i, "text": passage["text"]} for i, passage in enumerate(request.passages)]
+        started = time.perf_counter()
+        scores = self.client.call({"op": "rerank", "query": request.query, "passages": passages})["scores"]
+        logger.debug(f"Remote rerank of {len(passages)} passages took {(time.perf_counter() - started) * 1000:.1f}ms")
+        results = [dict(passage, score=score) for passage, score in zip(request.passages, scores)]
+        return sorted(results, key=lambda passage: passage["score"], reverse=True)
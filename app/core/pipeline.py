@@ -0,0 +1,124 @@
+import logging
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Stage = Callable[[Iterable[Any]], Iterable[Any]]
+
+_END = object()
+
+
+class PipelineAborted(Exception):
+    pass
+
+
+class StreamingPipeline:
+    """Runs a source and a chain of stages in threads joined by bounded queues.
+
+    Each stage is a function taking an iterator of inputs and yielding outputs,
+    so a stage may batch, filter or fan out items. Queues are bounded, so a slow
+    stage applies back pressure upstream and memory stays flat. The first error
+    in any stage stops the whole pipeline and is re-raised from `run()`.
+    """
+
+    def __init__(
+        self,
+        source: Iterable[Any],
+        stages: List[Tuple[str, Stage]],
+        queue_size: int = 8,
+    ):
+        self.source = source
+        self.stages = stages
+        self.queue_size = queue_size
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    def _put(self, q: "queue.Queue", item: Any) -> None:
+        while True:
+            if self._stop.is_set():
+                raise PipelineAborted()
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _drain(self, q: "queue.Queue") -> Iterator[Any]:
+        while True:
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    raise PipelineAborted()
+                continue
+            if item is _END:
+                return
+            yield item
+
+    def _run_thread(
+        self,
+        name: str,
+        items: Callable[[], Iterable[Any]],
+        out_queue: "queue.Queue",
+    ) -> None:
+        try:
+            for item in items():
+                self._put(out_queue, item)
+        except PipelineAborted:
+            pass
+        except BaseException as e:
+            logger.error(f"Pipeline stage '{name}' failed: {e}")
+            if self._error is None:
+                self._error = e
+            self._stop.set()
+        finally:
+            try:
+                self._put(out_queue, _END)
+            except PipelineAborted:
+                pass
+
+    def run(self) -> Iterator[Any]:
+        threads = []
+        in_queue: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        threads.append(
+            threading.Thread(
+                target=self._run_thread,
+                args=("source", lambda: self.source, in_queue),
+                name="pipeline-source",
+                daemon=True,
+            )
+        )
+
+        for name, stage in self.stages:
+            out_queue: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+            upstream = in_queue
+            threads.append(
+                threading.Thread(
+                    target=self._run_thread,
+                    args=(
+                        name,
+                        lambda stage=stage, upstream=upstream: stage(self._drain(upstream)),
+                        out_queue,
+                    ),
+                    name=f"pipeline-{name}",
+                    daemon=True,
+                )
+            )
+            in_queue = out_queue
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            yield from self._drain(in_queue)
+        except PipelineAborted:
+            pass
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,245 @@
+"""Per-stage profiling of index builds (`build_index.py --profile`).
+
+Pipeline stages run concurrently, so each stage reports the time it was busy
+rather than a share of the build's wall time. Throughput is computed over
+that busy time, which makes it comparable between runs even when another
+stage was the bottleneck.
+
+Memory is sampled the same way: each stage records the highest current RSS
+(this process plus its chunking workers) seen when it finished a unit of
+work. Stages overlap, so this is the footprint while the stage was running,
+not memory the stage itself allocated.
+"""
+
+import heapq
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+# Minimum time between two RSS samples; add() runs once per file
+RSS_SAMPLE_INTERVAL = 0.1
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """Lifetime peak resident set size of this process (or its reaped children) in MB."""
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def _statm_rss(pid: str) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _child_pids() -> List[str]:
+    pids: List[str] = []
+    try:
+        tasks = os.listdir("/proc/self/task")
+    except OSError:
+        return pids
+    for task in tasks:
+        try:
+            with open(f"/proc/self/task/{task}/children", encoding="ascii") as f:
+                pids.extend(f.read().split())
+        except OSError:
+            continue
+    return pids
+
+
+def current_rss_mb() -> Optional[float]:
+    """Current resident set size of this process plus its child processes in MB.
+
+    Read from /proc, so only available on Linux; None elsewhere.
+    """
+    own = _statm_rss("self")
+    if own is None:
+        return None
+    total = own + sum(_statm_rss(pid) or 0 for pid in _child_pids())
+    return round(total / (1024 * 1024), 1)
+
+
+@dataclass
+class StageProfile:
+    seconds: float = 0.0
+    files: int = 0
+    chunks: int = 0
+    tokens: int = 0
+    max_rss_mb: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        def rate(count: int) -> Optional[float]:
+            if not count or self.seconds <= 0:
+                return None
+            return round(count / self.seconds, 1)
+
+        return {
+            "seconds": round(self.seconds, 3),
+            "files": self.files,
+            "chunks": self.chunks,
+            "tokens": self.tokens,
+            "files_per_second": rate(self.files),
+            "chunks_per_second": rate(self.chunks),
+            "tokens_per_second": rate(self.tokens),
+            "max_rss_mb": self.max_rss_mb,
+        }
+
+
+class BuildProfiler:
+    """Collects stage timings, the slowest files and the largest chunks of a build."""
+
+    STAGES = ("walk", "read", "split", "embed", "write", "finalize")
+
+    def __init__(self, top_n: int = 20):
+        self.top_n = top_n
+        self.stages: Dict[str, StageProfile] = {name: StageProfile() for name in self.STAGES}
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        # Min-heaps holding the top_n largest entries seen so far
+        self._slowest_files: List[Tuple[float, str, Dict]] = []
+        self._largest_chunks: List[Tuple[int, str, Dict]] = []
+        self._lock = threading.Lock()
+        self.start_rss_mb = current_rss_mb()
+        self.max_rss_mb = self.start_rss_mb
+        self._rss_sampled = time.perf_counter()
+        self._rss = self.start_rss_mb
+
+    def _sample_rss(self) -> Optional[float]:
+        """Current RSS, re-read at most every RSS_SAMPLE_INTERVAL seconds. Call with the lock held."""
+        now = time.perf_counter()
+        if now - self._rss_sampled >= RSS_SAMPLE_INTERVAL:
+            self._rss_sampled = now
+            self._rss = current_rss_mb()
+            if self._rss is not None:
+                self.max_rss_mb = max(self.max_rss_mb or 0.0, self._rss)
+        return self._rss
+
+    def add(self, stage: str, seconds: float, files: int = 0, chunks: int = 0, tokens: int = 0) -> None:
+        with self._lock:
+            rss = self._sample_rss()
+            profile = self.stages.setdefault(stage, StageProfile())
+            profile.seconds += seconds
+            profile.files += files
+            profile.chunks += chunks
+            profile.tokens += tokens
+            if rss is not None:
+                profile.max_rss_mb = max(profile.max_rss_mb or 0.0, rss)
+
+    def _push(self, heap: List, entry: Tuple) -> None:
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, entry)
+        elif entry[0] > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+
+    def record_file(
+        self,
+        relative_path: str,
+        size: int,
+        read_seconds: float,
+        split_seconds: float,
+        chunks: int,
+    ) -> None:
+        total = read_seconds + split_seconds
+        with self._lock:
+            self._push(
+                self._slowest_files,
+                (
+                    total,
+                    relative_path,
+                    {
+                        "path": relative_path,
+                        "seconds": round(total, 4),
+                        "read_seconds": round(read_seconds, 4),
+                        "split_seconds": round(split_seconds, 4),
+                        "bytes": size,
+                        "chunks": chunks,
+                    },
+                ),
+            )
+
+    def record_chunks(self, ids: List[str], texts: List[str], metadatas: List[Dict], tokens: List[int]) -> None:
+        with self._lock:
+            for chunk_id, text, metadata, length in zip(ids, texts, metadatas, tokens):
+                self._push(
+                    self._largest_chunks,
+                    (
+                        length,
+                        chunk_id,
+                        {
+                            "chunk_id": chunk_id,
+                            "file_path": metadata.get("file_path"),
+                            "symbol": metadata.get("symbol"),
+                            "tokens": length,
+                            "chars": len(text),
+                        },
+                    ),
+                )
+
+    def report(self, stats: Dict) -> Dict:
+        with self._lock:
+            self._rss_sampled = float("-inf")
+            self._sample_rss()
+            return {
+                "started_at": self.started_at,
+                "wall_seconds": round(time.perf_counter() - self.started, 3),
+                # Sampled during this build, including live worker processes
+                "start_rss_mb": self.start_rss_mb,
+                "max_rss_mb": self.max_rss_mb,
+                # Lifetime peaks of the process, which may predate this build
+                # (watch mode, several shards in one process)
+                "process_peak_rss_mb": peak_rss_mb(),
+                "children_peak_rss_mb": peak_rss_mb(children=True),
+                "stages": {name: profile.to_dict() for name, profile in self.stages.items()},
+                "slowest_files": [entry for _, _, entry in sorted(self._slowest_files, reverse=True)],
+                "largest_chunks": [entry for _, _, entry in sorted(self._largest_chunks, reverse=True)],
+                "stats": stats,
+            }
+
+    def write(self, path: Path, stats: Dict) -> Dict:
+        report = self.report(stats)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"Wrote build profile to {path}")
+        return report
+
+    def summary_lines(self) -> List[str]:
+        lines = []
+        for name, profile in self.stages.items():
+            data = profile.to_dict()
+            rates = ", ".join(
+                f"{data[key]} {unit}/s"
+                for key, unit in (
+                    ("files_per_second", "files"),
+                    ("chunks_per_second", "chunks"),
+                    ("tokens_per_second", "tokens"),
+                )
+                if data[key] is not None
+            )
+            lines.append(
+                f"{name:<8} {data['seconds']:>9.2f}s  {rates or '-'}  "
+                f"(max RSS: {data['max_rss_mb']} MB)"
+            )
+        return lines
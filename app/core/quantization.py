@@ -0,0 +1,370 @@
+"""Quantized vector search served without Chroma's float32 vectors.
+
+Chroma keeps the float32 vectors as the source of truth for builds. After
+each build the vectors are exported next to it in the version directory:
+
+- `<collection>.quantized.npz`: int8 codes with a per-dimension scale (4x
+  smaller than float32) or sign bits (32x smaller), loaded into memory.
+- `<collection>.quantized.f16.npy`: float16 copies for rescoring, memory
+  mapped, so only the pages of rows that become candidates are read.
+
+Search scans the codes for `k * rescore_factor` candidates, rescores those
+with their float16 vectors and only then asks Chroma for the documents, by
+id. Chroma's HNSW index is never queried, so a server with quantization on
+does not load it: resident memory is the codes instead of the float32
+vectors plus the graph. The scan is brute force, trading the graph's
+sublinear lookup for a linear pass over compact codes; compare both on your
+index with scripts/bench_vector_search.py before enabling it.
+"""
+
+import logging
+import os
+import time
+from pathlib import Path
+from typing import AbstractSet, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_KINDS = ("none", "int8", "binary")
+
+# Rows dequantized at a time, bounding the float32 scratch memory of a scan
+SCAN_BLOCK = 16384
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def distances(vectors: np.ndarray, query: np.ndarray, space: str = "l2") -> np.ndarray:
+    """Distance of each row to `query` as Chroma computes it in `space` (hnsw:space)."""
+    if space == "cosine":
+        norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+        return 1.0 - (vectors @ query) / np.where(norms == 0, 1.0, norms)
+    if space == "ip":
+        return 1.0 - vectors @ query
+    # Chroma's l2 is the squared Euclidean distance
+    return ((vectors - query) ** 2).sum(axis=1)
+
+
+def quantized_index_path(persist_dir: Path, collection_name: str) -> Path:
+    return persist_dir / f"{collection_name}.quantized.npz"
+
+
+def rescore_vectors_path(path: Path) -> Path:
+    """The float16 rescoring vectors stored alongside the codes at `path`."""
+    return path.with_name(path.name[: -len(".npz")] + ".f16.npy")
+
+
+class QuantizedIndex:
+    """int8 or binary codes of every stored vector, scanned brute force and rescored in float16."""
+
+    def __init__(
+        self,
+        kind: str,
+        ids: np.ndarray,
+        codes: np.ndarray,
+        scale: Optional[np.ndarray],
+        vectors: np.ndarray,
+        meta: Dict,
+    ):
+        self.kind = kind
+        self.ids = ids
+        self.codes = codes
+        self.scale = scale
+        # float16, row i belongs to ids[i]; a read-only memory map once loaded
+        self.vectors = vectors
+        self.meta = meta
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the scan: ids, codes and scale (the rescoring vectors are mapped)."""
+        return self.ids.nbytes + self.codes.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    @staticmethod
+    def _encode(kind: str, vectors: np.ndarray, scale: Optional[np.ndarray]) -> np.ndarray:
+        if kind == "int8":
+            return np.clip(np.rint(vectors / scale), -127, 127).astype(np.int8)
+        return np.packbits(vectors > 0, axis=1)
+
+    @classmethod
+    def build(cls, kind: str, ids: Sequence[str], vectors: np.ndarray) -> "QuantizedIndex":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if kind == "int8":
+            # Symmetric per-dimension scale keeps zero exact and uses the full range
+            scale = np.abs(vectors).max(axis=0) / 127.0
+            scale[scale == 0] = 1.0
+        elif kind == "binary":
+            scale = None
+        else:
+            raise ValueError(f"Unknown quantization: {kind} (expected int8 or binary)")
+        codes = cls._encode(kind, vectors, scale)
+        meta = {"dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0, "built_at": time.time()}
+        return cls(kind, np.asarray(ids, dtype=str), codes, scale, vectors.astype(np.float16), meta)
+
+    def updated(self, keep_rows: np.ndarray, ids: Sequence[str], vectors: np.ndarray) -> "QuantizedIndex":
+        """A copy holding only `keep_rows` of this index plus `vectors` appended under `ids`.
+
+        New int8 rows reuse this index's scale (values past it are clipped);
+        a full build fits the scale again.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.meta["dim"])
+        return QuantizedIndex(
+            self.kind,
+            np.concatenate([self.ids[keep_rows], np.asarray(ids, dtype=str)]),
+            np.concatenate([self.codes[keep_rows], self._encode(self.kind, vectors, self.scale)]),
+            self.scale,
+            np.concatenate([self.vectors[keep_rows], vectors.astype(np.float16)]),
+            {"dim": self.meta["dim"], "built_at": time.time()},
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["QuantizedIndex"]:
+        vectors_path = rescore_vectors_path(path)
+        if not path.exists() or not vectors_path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                kind = str(data["kind"])
+                scale = data["scale"] if kind == "int8" else None
+                meta = {"dim": int(data["dim"]), "built_at": float(data["built_at"])}
+                ids, codes = data["ids"], data["codes"]
+            vectors = np.load(vectors_path, mmap_mode="r", allow_pickle=False)
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable quantized index {path}: {e}")
+            return None
+        if len(vectors) != len(ids):
+            logger.warning(f"Ignoring quantized index {path}: {len(ids)} ids but {len(vectors)} vectors")
+            return None
+        return cls(kind, ids, codes, scale, vectors, meta)
+
+    def save(self, path: Path) -> None:
+        vectors_path = rescore_vectors_path(path)
+        tmp_vectors_path = vectors_path.with_name(vectors_path.name + ".tmp")
+        with open(tmp_vectors_path, "wb") as f:
+            np.save(f, np.asarray(self.vectors, dtype=np.float16))
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                kind=np.array(self.kind),
+                ids=self.ids,
+                codes=self.codes,
+                scale=self.scale if self.scale is not None else np.zeros(0, dtype=np.float32),
+                dim=np.array(self.meta["dim"]),
+                built_at=np.array(self.meta["built_at"]),
+            )
+        os.replace(tmp_vectors_path, vectors_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def remove(path: Path) -> None:
+        path.unlink(missing_ok=True)
+        rescore_vectors_path(path).unlink(missing_ok=True)
+
+    def _scores(self, query: np.ndarray) -> np.ndarray:
+        """Approximate similarity of every row to `query`, higher is closer."""
+        if self.kind == "binary":
+            query_bits = np.packbits(query > 0)
+            scores = np.empty(len(self.codes), dtype=np.float32)
+            for start in range(0, len(self.codes), SCAN_BLOCK):
+                block = np.bitwise_xor(self.codes[start : start + SCAN_BLOCK], query_bits)
+                scores[start : start + SCAN_BLOCK] = -_POPCOUNT[block].sum(axis=1, dtype=np.int32)
+            return scores
+
+        # q . (codes * scale) == (q * scale) . codes
+        scaled_query = query * self.scale
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), SCAN_BLOCK):
+            block = self.codes[start : start + SCAN_BLOCK].astype(np.float32)
+            scores[start : start + SCAN_BLOCK] = block @ scaled_query
+        return scores
+
+    def candidates(self, query: Sequence[float], k: int) -> np.ndarray:
+        """Rows of the `k` best first-pass candidates by code similarity, best first."""
+        if not len(self.ids) or k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        scores = self._scores(np.asarray(query, dtype=np.float32))
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    def search(
+        self,
+        query: Sequence[float],
+        k: int,
+        rescore_factor: int = 4,
+        space: str = "l2",
+    ) -> List[Tuple[str, float]]:
+        """(id, distance) of the `k` nearest vectors, nearest first.
+
+        Distances are computed from the float16 vectors of the
+        `k * rescore_factor` first-pass candidates, on the scale Chroma
+        reports for a collection with this `space`.
+        """
+        rows = self.candidates(query, k * max(rescore_factor, 1))
+        if not len(rows):
+            return []
+        # Sorted rows read the memory map front to back
+        rows = np.sort(rows)
+        vectors = np.asarray(self.vectors[rows], dtype=np.float32)
+        scores = distances(vectors, np.asarray(query, dtype=np.float32), space)
+        order = np.argsort(scores, kind="stable")[:k]
+        return [(str(self.ids[rows[i]]), float(scores[i])) for i in order]
+
+
+def read_all_vectors(collection, batch_size: int = 5000) -> Tuple[List[str], np.ndarray]:
+    """Page every id and float vector out of a Chroma collection."""
+    ids: List[str] = []
+    blocks: List[np.ndarray] = []
+    offset = 0
+    while True:
+        page = collection.get(include=["embeddings"], limit=batch_size, offset=offset)
+        if not page["ids"]:
+            break
+        ids.extend(page["ids"])
+        blocks.append(np.asarray(page["embeddings"], dtype=np.float32))
+        offset += len(page["ids"])
+    if not blocks:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    return ids, np.vstack(blocks)
+
+
+def read_vectors(collection, ids: Sequence[str], batch_size: int = 5000) -> Tuple[List[str], np.ndarray]:
+    """Fetch the float vectors of `ids` from a Chroma collection, in the order Chroma returns them."""
+    found: List[str] = []
+    blocks: List[np.ndarray] = []
+    for start in range(0, len(ids), batch_size):
+        page = collection.get(ids=list(ids[start : start + batch_size]), include=["embeddings"])
+        if page["ids"]:
+            found.extend(page["ids"])
+            blocks.append(np.asarray(page["embeddings"], dtype=np.float32))
+    if not blocks:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    return found, np.vstack(blocks)
+
+
+def measure_recall(
+    index: QuantizedIndex,
+    vectors: np.ndarray,
+    k: int = 10,
+    rescore_factor: int = 4,
+    sample: int = 100,
+    seed: int = 0,
+) -> Dict[str, float]:
+    """Recall@k of the quantized scan against exact float32 search, before and after rescoring.
+
+    Stored vectors serve as queries (their own id is excluded from both
+    result lists), since real queries land in the same embedding space.
+    """
+    count = len(vectors)
+    if count <= k:
+        return {"recall_first_pass": 1.0, "recall_rescored": 1.0, "queries": 0, "k": k}
+
+    rng = np.random.default_rng(seed)
+    queries = rng.choice(count, size=min(sample, count), replace=False)
+    position = {str(chunk_id): i for i, chunk_id in enumerate(index.ids)}
+    first_pass_hits = rescored_hits = 0
+    for query_index in queries:
+        query = vectors[query_index]
+        exact_scores = vectors @ query
+        exact_scores[query_index] = -np.inf
+        exact = set(np.argpartition(-exact_scores, k - 1)[:k].tolist())
+
+        first_pass = [row for row in index.candidates(query, k + 1).tolist() if row != query_index]
+        first_pass_hits += len(exact & set(first_pass[:k]))
+        rescored = [
+            position[chunk_id]
+            for chunk_id, _ in index.search(query, k + 1, rescore_factor)
+            if position[chunk_id] != query_index
+        ]
+        rescored_hits += len(exact & set(rescored[:k]))
+
+    total = len(queries) * k
+    return {
+        "recall_first_pass": round(first_pass_hits / total, 4),
+        "recall_rescored": round(rescored_hits / total, 4),
+        "queries": int(len(queries)),
+        "k": k,
+    }
+
+
+def export_quantized_index(
+    collection,
+    path: Path,
+    kind: str,
+    rescore_factor: int = 4,
+    recall_sample: int = 100,
+) -> Dict:
+    """Quantize every vector in `collection`, save it to `path` and measure recall."""
+    started = time.perf_counter()
+    ids, vectors = read_all_vectors(collection)
+    index = QuantizedIndex.build(kind, ids, vectors) if ids else None
+    if index is None:
+        QuantizedIndex.remove(path)
+        return {"kind": kind, "vectors": 0}
+
+    index.save(path)
+    recall = measure_recall(index, vectors, rescore_factor=rescore_factor, sample=recall_sample)
+    report = {
+        "kind": kind,
+        "vectors": len(index),
+        "float_bytes": int(vectors.nbytes),
+        "quantized_bytes": int(index.nbytes),
+        "rescore_bytes": int(index.vectors.nbytes),
+        "compression": round(vectors.nbytes / max(index.nbytes, 1), 1),
+        "seconds": round(time.perf_counter() - started, 2),
+        **recall,
+    }
+    logger.info(f"Exported {kind} quantized index to {path}: {report}")
+    return report
+
+
+def update_quantized_index(
+    collection,
+    path: Path,
+    kind: str,
+    live_ids: Sequence[str],
+    changed_ids: AbstractSet[str],
+) -> Optional[Dict]:
+    """Bring the quantized index copied from the previous version up to date with this build.
+
+    `live_ids` are every chunk in the collection after the build and
+    `changed_ids` the ones it wrote. Rows of deleted or rewritten chunks are
+    dropped and only the vectors of chunks without a current row are read
+    from Chroma. Recall is not measured; a full export measures it. Returns
+    None when there is no usable previous index, so the caller exports in full.
+    """
+    started = time.perf_counter()
+    previous = QuantizedIndex.load(path)
+    if previous is None or previous.kind != kind:
+        return None
+    live = set(live_ids)
+    keep_rows = np.array(
+        [row for row, chunk_id in enumerate(previous.ids.tolist()) if chunk_id in live and chunk_id not in changed_ids],
+        dtype=np.int64,
+    )
+    kept = set(previous.ids[keep_rows].tolist())
+    ids, vectors = read_vectors(collection, [chunk_id for chunk_id in live_ids if chunk_id not in kept])
+    if ids and vectors.shape[1] != previous.meta["dim"]:
+        logger.info(f"Embedding dimension changed ({previous.meta['dim']} -> {vectors.shape[1]})")
+        return None
+    index = previous.updated(keep_rows, ids, vectors)
+    if not len(index):
+        QuantizedIndex.remove(path)
+        return {"kind": kind, "vectors": 0}
+
+    index.save(path)
+    report = {
+        "kind": kind,
+        "vectors": len(index),
+        "vectors_updated": len(ids),
+        "vectors_removed": len(previous) - len(keep_rows),
+        "quantized_bytes": int(index.nbytes),
+        "rescore_bytes": int(index.vectors.nbytes),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    logger.info(f"Updated {kind} quantized index {path}: {report}")
+    return report
@@ -1,15 +1,30 @@
 import asyncio
+import heapq
 import logging
 import re
-from typing import List, Optional
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Awaitable, Dict, Iterator, List, Optional, Tuple
 
 from flashrank import Ranker, RerankRequest
 from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
 from langchain_openai import ChatOpenAI
 from langchain.schema import Document
 
 from app.config import settings
+from app.core.cache import LRUCache, TranslationCache
+from app.core.embeddings import get_embeddings
+from app.core.fusion import reciprocal_rank_fusion
+from app.core.glossary import Glossary
+from app.core.lexical import LexicalIndex
+from app.core.model_server import ModelClient, RemoteEmbeddings, RemoteRanker
+from app.core.quantization import QuantizedIndex, quantized_index_path
+from app.core.symbols import SymbolIndex, count_other_words, extract_identifiers
+from app.core.vectorstore import close_vectorstore, distance_space, open_vectorstore
+from app.core.versions import IndexVersion, IndexVersions, VersionPin
 
 logger = logging.getLogger(__name__)
 
@@ -39,9 +54,259 @@ English:"""
         return query
 
 
+def _document_key(doc: Document) -> tuple:
+    return (
+        doc.metadata.get("collection"),
+        doc.metadata.get("file_path"),
+        doc.metadata.get("chunk_index"),
+    )
+
+
+class IndexHandle:
+    """One opened index version: its Chroma client and the side indexes loaded from it.
+
+    Queries hold a reference for as long as they use the version. The shard
+    holds one more until it moves to a newer version; whoever drops the last
+    reference closes the Chroma client, so a superseded version stays open
+    exactly until the queries already running on it have finished.
+    """
+
+    def __init__(
+        self,
+        version: IndexVersion,
+        vectorstore: Chroma,
+        quantized: Optional[QuantizedIndex],
+        symbols: Optional[SymbolIndex],
+        lexical: Optional[LexicalIndex],
+        pin: VersionPin,
+    ):
+        self.version = version
+        self.vectorstore = vectorstore
+        self.quantized = quantized
+        self.symbols = symbols
+        self.lexical = lexical
+        self.pin = pin
+        self._refs = 1
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            self._refs += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self._refs -= 1
+            if self._refs:
+                return
+        close_vectorstore(self.vectorstore)
+        # Only now may the builder prune the directory
+        self.pin.release()
+        logger.info(f"Closed index version {self.version.version}")
+
+
+class IndexShard:
+    """One searchable collection and the index version it currently serves."""
+
+    def __init__(self, collection_name: str, embeddings: Embeddings):
+        self.collection_name = collection_name
+        self.embeddings = embeddings
+        self.versions = IndexVersions(settings.chroma_db_path, collection_name)
+        self._reload_lock = threading.Lock()
+        # Guards swapping self._handle against queries acquiring it
+        self._handle_lock = threading.Lock()
+        self._pointer_mtime = self.versions.pointer_mtime()
+        self._handle = self._open(self.versions.active())
+
+    def _open(self, version: IndexVersion) -> IndexHandle:
+        pin = self.versions.pin(version)
+        if pin is None:
+            raise FileNotFoundError(f"Index version {version.version} of {self.collection_name} was removed")
+        vectorstore = open_vectorstore(version.path, self.collection_name, self.embeddings)
+        quantized = None
+        if settings.vector_quantization != "none":
+            quantized = QuantizedIndex.load(quantized_index_path(version.path, self.collection_name))
+            if quantized is None:
+                logger.warning(
+                    f"No quantized index in {version.path}, using full-precision search "
+                    f"until the next build"
+                )
+        symbols = None
+        if settings.symbol_search:
+            symbols = SymbolIndex.load(SymbolIndex.path_for(version.path, self.collection_name))
+        lexical = None
+        if settings.hybrid_search:
+            lexical = LexicalIndex.load(LexicalIndex.path_for(version.path, self.collection_name))
+            if not lexical.exists():
+                logger.warning(f"No lexical index in {version.path}, hybrid search disabled until the next build")
+                lexical = None
+        logger.info(
+            f"Connected to ChromaDB: {version.path} "
+            f"(collection: {self.collection_name}, index version: {version.version})"
+        )
+        if quantized is not None:
+            logger.info(
+                f"Loaded {quantized.kind} quantized index: {len(quantized)} vectors, "
+                f"{quantized.nbytes / 1024 / 1024:.1f} MB"
+            )
+        return IndexHandle(version, vectorstore, quantized, symbols, lexical, pin)
+
+    @contextmanager
+    def _acquire(self) -> Iterator[IndexHandle]:
+        with self._handle_lock:
+            handle = self._handle
+            handle.acquire()
+        try:
+            yield handle
+        finally:
+            handle.release()
+
+    @property
+    def index_version(self) -> str:
+        return self._handle.version.version
+
+    @property
+    def vectorstore(self) -> Chroma:
+        return self._handle.vectorstore
+
+    def reload_if_promoted(self) -> bool:
+        with self._reload_lock:
+            mtime = self.versions.pointer_mtime()
+            if mtime == self._pointer_mtime:
+                return False
+            self._pointer_mtime = mtime
+            current = self.versions.current()
+            if current is None or current.version == self.index_version:
+                return False
+            logger.info(
+                f"New index version promoted for {self.collection_name}: "
+                f"{self.index_version} -> {current.version}"
+            )
+            try:
+                handle = self._open(current)
+            except FileNotFoundError as e:
+                # Superseded again before we got to it; the next check picks up the newer one
+                logger.warning(f"{e}, keeping {self.index_version}")
+                self._pointer_mtime = None
+                return False
+            with self._handle_lock:
+                previous, self._handle = self._handle, handle
+            # Closes the old version now, or when its last running query finishes
+            previous.release()
+            return True
+
+    def count(self) -> int:
+        with self._acquire() as handle:
+            return handle.vectorstore._collection.count()
+
+    def _get_documents(self, vectorstore: Chroma, ids: List[str]) -> Dict[str, Document]:
+        found = vectorstore._collection.get(ids=ids, include=["documents", "metadatas"])
+        documents = {}
+        for chunk_id, text, metadata in zip(found["ids"], found["documents"], found["metadatas"]):
+            metadata = dict(metadata or {})
+            metadata["collection"] = self.collection_name
+            documents[chunk_id] = Document(page_content=text, metadata=metadata)
+        return documents
+
+    def lookup_symbols(self, identifiers: List[str], limit: int) -> List[Document]:
+        with self._acquire() as handle:
+            if handle.symbols is None:
+                return []
+            matches: Dict[str, str] = {}
+            for identifier in identifiers:
+                for chunk_id in handle.symbols.lookup(identifier, limit):
+                    matches.setdefault(chunk_id, identifier)
+            if not matches:
+                return []
+            found = self._get_documents(handle.vectorstore, list(matches))
+
+        documents = []
+        for chunk_id, identifier in matches.items():
+            if chunk_id in found:
+                found[chunk_id].metadata["symbol_match"] = identifier
+                documents.append(found[chunk_id])
+        return documents
+
+    def search_lexical(self, query: str, k: int) -> List[Document]:
+        with self._acquire() as handle:
+            if handle.lexical is None:
+                return []
+            hits = handle.lexical.search(query, k)
+            if not hits:
+                return []
+            found = self._get_documents(handle.vectorstore, [chunk_id for chunk_id, _ in hits])
+
+        documents = []
+        for chunk_id, score in hits:
+            if chunk_id in found:
+                found[chunk_id].metadata["bm25_score"] = score
+                documents.append(found[chunk_id])
+        return documents
+
+    def _search_quantized(
+        self,
+        vectorstore: Chroma,
+        quantized: QuantizedIndex,
+        query_vector: List[float],
+        k: int,
+    ) -> List[Tuple[Document, float]]:
+        # Same distance scale as the collection's own queries
+        hits = quantized.search(
+            query_vector,
+            k,
+            settings.quantization_rescore_factor,
+            space=distance_space(vectorstore),
+        )
+        if not hits:
+            return []
+        # Documents only: asking Chroma for embeddings would load its vector index
+        found = vectorstore._collection.get(
+            ids=[chunk_id for chunk_id, _ in hits],
+            include=["documents", "metadatas"],
+        )
+        documents = {
+            chunk_id: Document(page_content=text, metadata=dict(metadata or {}))
+            for chunk_id, text, metadata in zip(found["ids"], found["documents"], found["metadatas"])
+        }
+        return [(documents[chunk_id], distance) for chunk_id, distance in hits if chunk_id in documents]
+
+    def _search_chroma(self, vectorstore: Chroma, query_vector: List[float], k: int) -> List[Tuple[Document, float]]:
+        results = vectorstore._collection.query(
+            query_embeddings=[query_vector],
+            n_results=k,
+            include=["documents", "metadatas", "distances"],
+        )
+        return [
+            (Document(page_content=text, metadata=dict(metadata or {})), distance)
+            for text, metadata, distance in zip(
+                results["documents"][0], results["metadatas"][0], results["distances"][0]
+            )
+        ]
+
+    def search(self, query_vector: List[float], k: int) -> List[Document]:
+        """The `k` chunks nearest to `query_vector`.
+
+        `similarity_score` is Chroma's distance, lower is closer, as
+        `similarity_search_with_score` reported it before queries were
+        embedded outside Chroma. The quantized path rescores on the same
+        scale, so the field means the same with VECTOR_QUANTIZATION on.
+        """
+        with self._acquire() as handle:
+            if handle.quantized is not None:
+                results = self._search_quantized(handle.vectorstore, handle.quantized, query_vector, k)
+            else:
+                results = self._search_chroma(handle.vectorstore, query_vector, k)
+        documents = []
+        for doc, score in results:
+            doc.metadata["similarity_score"] = score
+            doc.metadata["collection"] = self.collection_name
+            documents.append(doc)
+        return documents
+
+
 class CodebaseSearch:
 
     _instance: Optional["CodebaseSearch"] = None
+    _init_lock = threading.Lock()
 
     def __new__(cls) -> "CodebaseSearch":
         if cls._instance is None:
@@ -52,29 +317,45 @@ class CodebaseSearch:
     def __init__(self):
         if self._initialized:
             return
-            
+        # The startup warm-up builds the singleton on a worker thread while
+        # requests may already be arriving; only one of them loads the models
+        with self._init_lock:
+            if not self._initialized:
+                self._initialize()
+
+    def _initialize(self) -> None:
         logger.info("Initializing CodebaseSearch (singleton)...")
+        # Seconds spent loading each component, reported by /api/ready
+        self.load_seconds: Dict[str, float] = {}
         
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=settings.embedding_model,
-            model_kwargs={'device': settings.embedding_device, 'trust_remote_code': True},
-            encode_kwargs={'normalize_embeddings': True},
-        )
-        logger.info(f"Loaded embedding model: {settings.embedding_model} (device: {settings.embedding_device})")
-        
-        self.vectorstore = Chroma(
-            collection_name=settings.collection_name,
-            embedding_function=self.embeddings,
-            persist_directory=str(settings.chroma_db_path),
-        )
-        logger.info(f"Connected to ChromaDB: {settings.chroma_db_path}")
+        started = time.perf_counter()
+        if settings.model_server_socket:
+            client = ModelClient(Path(settings.model_server_socket), timeout=settings.model_server_timeout)
+            status = client.ping()
+            self.embeddings = RemoteEmbeddings(client)
+            self.reranker = RemoteRanker(client)
+            self.load_seconds["model_server"] = time.perf_counter() - started
+            logger.info(f"Using model server at {settings.model_server_socket}: {status}")
+        else:
+            self.embeddings = get_embeddings()
+            self.load_seconds["embeddings"] = time.perf_counter() - started
+            started = time.perf_counter()
+            self.reranker = Ranker(
+                model_name=settings.rerank_model,
+                max_length=settings.rerank_max_length
+            )
+            self.load_seconds["reranker"] = time.perf_counter() - started
+            logger.info(f"Loaded reranker: {settings.rerank_model} (max_length={settings.rerank_max_length})")
         
-        self.reranker = Ranker(
-            model_name=settings.rerank_model,
-            max_length=settings.rerank_max_length
-        )
-        logger.info(f"Loaded reranker: {settings.rerank_model} (max_length={settings.rerank_max_length})")
+        started = time.perf_counter()
+        self.shards = [
+            IndexShard(collection_name, self.embeddings)
+            for collection_name in settings.search_collection_names
+        ]
+        self.load_seconds["chroma"] = time.perf_counter() - started
+        self._last_reload_check = time.monotonic()
         
+        started = time.perf_counter()
         self.llm = ChatOpenAI(
             model=settings.llm_model,
             api_key=settings.llm_api_key,
@@ -83,9 +364,106 @@ class CodebaseSearch:
         )
         logger.info("LLM client initialized for query translation")
         
+        self.translation_cache = TranslationCache(
+            path=settings.translation_cache_path,
+            model_name=settings.llm_model,
+            ttl=settings.translation_cache_ttl,
+            memory_entries=settings.translation_cache_memory_entries,
+            max_entries=settings.translation_cache_max_entries,
+        )
+        self.glossary = Glossary.load(settings.glossary_path)
+        logger.info(f"Loaded glossary: {settings.glossary_path} ({len(self.glossary)} terms)")
+        self.load_seconds["translation"] = time.perf_counter() - started
+        
+        self.query_embedding_cache = LRUCache[List[float]](settings.query_embedding_cache_entries)
+        self.result_cache = LRUCache[List[Document]](settings.search_result_cache_entries)
+        
         self._initialized = True
         logger.info("CodebaseSearch initialization complete")
 
+    def warm_up(self) -> Dict[str, float]:
+        """Run one embedding and one rerank so the first real query skips kernel/graph setup."""
+        timings = {}
+        started = time.perf_counter()
+        self.embeddings.embed_query("warm-up query for the embedding model")
+        timings["warmup_embed"] = time.perf_counter() - started
+        started = time.perf_counter()
+        self.reranker.rerank(
+            RerankRequest(
+                query="warm-up query for the reranker",
+                passages=[{"id": 0, "text": "fun main() { println(\"warm-up\") }"}],
+            )
+        )
+        timings["warmup_rerank"] = time.perf_counter() - started
+        return timings
+
+    def document_counts(self) -> Dict[str, int]:
+        return {shard.collection_name: shard.count() for shard in self.shards}
+
+    @property
+    def vectorstore(self) -> Chroma:
+        return self.shards[0].vectorstore
+
+    @property
+    def index_version(self) -> str:
+        if len(self.shards) == 1:
+            return self.shards[0].index_version
+        return ",".join(f"{shard.collection_name}@{shard.index_version}" for shard in self.shards)
+
+    def _lookup_symbols(self, identifiers: List[str]) -> List[Document]:
+        documents: List[Document] = []
+        for shard in self.shards:
+            documents.extend(shard.lookup_symbols(identifiers, settings.symbol_max_hits))
+        return documents
+
+    async def _translate(self, query: str) -> str:
+        cached = await asyncio.to_thread(self.translation_cache.get, query)
+        if cached is not None:
+            logger.info(f"Translated query (cached): '{query}' -> '{cached}'")
+            return cached
+        local = self.glossary.translate(query, settings.glossary_expansions)
+        if self.glossary and local.text and local.coverage >= settings.glossary_min_coverage:
+            logger.info(f"Translated query (glossary, {local.coverage:.0%} covered): '{query}' -> '{local.text}'")
+            return local.text
+        translated = await _translate_query_to_english(query, self.llm)
+        # The original query comes back when the LLM call failed; do not cache that
+        if translated != query:
+            await asyncio.to_thread(self.translation_cache.put, query, translated)
+        return translated
+
+    def _reload_if_promoted(self) -> None:
+        reloaded = [shard.reload_if_promoted() for shard in self.shards]
+        glossary = self.glossary.reload_if_changed()
+        if any(reloaded) or glossary is not self.glossary:
+            self.glossary = glossary
+            # Result keys carry the index version already; clearing frees the memory
+            self.query_embedding_cache.clear()
+            self.result_cache.clear()
+            logger.info("Cleared query embedding and search result caches")
+
+    async def embed_question(self, question: str) -> List[float]:
+        """Embed a raw question, picking up a newly promoted index version first.
+
+        Callers that cache by `index_version` (the answer cache) go through
+        here so a cache hit can never outlive the index it was answered from.
+        """
+        await self._maybe_reload()
+        return await self._embed_query(question)
+
+    async def _embed_query(self, text: str) -> List[float]:
+        vector = self.query_embedding_cache.get(text)
+        if vector is None:
+            vector = await asyncio.to_thread(self.embeddings.embed_query, text)
+            self.query_embedding_cache.put(text, vector)
+        return vector
+
+    async def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._last_reload_check < settings.index_reload_interval:
+            return
+        self._last_reload_check = now
+        await asyncio.to_thread(self._reload_if_promoted)
+
     def _rerank_documents(
         self, 
         query: str, 
@@ -95,21 +473,49 @@ class CodebaseSearch:
         if not documents:
             return []
         
-        passages = [
-            {"id": i, "text": doc.page_content, "meta": doc.metadata}
-            for i, doc in enumerate(documents)
-        ]
-        
-        rerank_request = RerankRequest(query=query, passages=passages)
-        reranked = self.reranker.rerank(rerank_request)
+        window = settings.rerank_cascade_window
+        end = len(documents) if window <= 0 else min(max(window, top_n), len(documents))
+        start = 0
+        scores: Dict[int, float] = {}
+        rounds = 0
+        reason = "all candidates"
+        while True:
+            rounds += 1
+            passages = [
+                {"id": i, "text": documents[i].page_content, "meta": documents[i].metadata}
+                for i in range(start, end)
+            ]
+            rerank_request = RerankRequest(query=query, passages=passages)
+            for item in self.reranker.rerank(rerank_request):
+                scores[item["id"]] = float(item["score"])
+            if end >= len(documents):
+                break
+            
+            # Candidates arrive in retrieval order, so deeper ones are weaker still:
+            # stop when the top N is already confident, or when the back half of
+            # the latest slice trails the Nth best score by a clear margin
+            nth_score = heapq.nlargest(top_n, scores.values())[-1]
+            tail_score = max(scores[i] for i in range(start + (end - start) // 2, end))
+            if nth_score >= settings.rerank_cascade_confidence:
+                reason = "confident"
+                break
+            if tail_score < nth_score - settings.rerank_cascade_margin:
+                reason = "score gap"
+                break
+            start, end = end, min(end * 2, len(documents))
         
         result = []
-        for item in reranked[:top_n]:
-            original_doc = documents[item["id"]]
-            original_doc.metadata["rerank_score"] = item["score"]
+        for i in sorted(scores, key=scores.__getitem__, reverse=True)[:top_n]:
+            original_doc = documents[i]
+            original_doc.metadata["rerank_score"] = scores[i]
+            # The cascade may stop early; callers see how deep it went per query
+            original_doc.metadata["reranked_passages"] = len(scores)
             result.append(original_doc)
             
-        logger.debug(f"Reranked {len(documents)} -> {len(result)} documents")
+        logger.info(
+            f"Reranked {len(scores)}/{len(documents)} passages in {rounds} "
+            f"round{'s' if rounds > 1 else ''} ({reason}) -> {len(result)} documents"
+        )
         return result
 
     async def search(
@@ -123,31 +529,198 @@ class CodebaseSearch:
         
         logger.info(f"Searching codebase: query='{query[:50]}...' retrieve_k={retrieve_k} rerank_top_n={final_n}")
         
+        await self._maybe_reload()
+
+        cache_key = self._result_key(query, retrieve_k, final_n)
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Returning {len(cached)} cached documents (index version {self.index_version})")
+            return list(cached)
+        
+        documents = await self._search(query, retrieve_k, final_n)
+        self.result_cache.put(cache_key, documents)
+        return list(documents)
+
+    async def search_many(
+        self,
+        queries: List[str],
+        top_k: Optional[int] = None,
+        rerank_top_n: Optional[int] = None,
+    ) -> List[List[Document]]:
+        """Search several queries at once, in the order given.
+
+        Same results as calling `search` per query, but only Korean queries are
+        translated, every query that needs a vector is embedded in one model
+        call, and the collection lookups and reranks of all queries run together.
+        """
+        retrieve_k = top_k if top_k is not None else settings.retrieve_top_k
+        final_n = rerank_top_n if rerank_top_n is not None else settings.rerank_top_n
+        
+        logger.info(f"Searching codebase: {len(queries)} queries retrieve_k={retrieve_k} rerank_top_n={final_n}")
+        
+        await self._maybe_reload()
+
+        results: List[Optional[List[Document]]] = [None] * len(queries)
+        pending: Dict[str, List[int]] = {}
+        for i, query in enumerate(queries):
+            cached = self.result_cache.get(self._result_key(query, retrieve_k, final_n))
+            if cached is not None:
+                results[i] = list(cached)
+            else:
+                pending.setdefault(query, []).append(i)
+        logger.info(f"{len(queries) - sum(map(len, pending.values()))} of {len(queries)} queries served from cache")
+
+        unique = list(pending)
+        symbol_stages = await asyncio.gather(*(self._symbol_stage(query, final_n) for query in unique))
+        remaining = [
+            (query, symbol_documents)
+            for query, (symbol_documents, resolved) in zip(unique, symbol_stages)
+            if resolved is None
+        ]
+        documents_by_query = {
+            query: resolved
+            for query, (_, resolved) in zip(unique, symbol_stages)
+            if resolved is not None
+        }
+
+        search_queries = await asyncio.gather(
+            *(self._translate(query) if _contains_korean(query) else asyncio.sleep(0, result=query)
+              for query, _ in remaining)
+        )
+        vectors = await self._embed_queries(list(search_queries))
+        # The vectors are ready, so each retrieval gets an already resolved awaitable
+        retrieved = await asyncio.gather(
+            *(
+                self._retrieve(search_query, asyncio.sleep(0, result=vectors[search_query]), retrieve_k)
+                for search_query in search_queries
+            )
+        )
+        finished = await asyncio.gather(
+            *(
+                self._finish(search_query, documents, symbol_documents, final_n)
+                for search_query, documents, (_, symbol_documents) in zip(search_queries, retrieved, remaining)
+            )
+        )
+        documents_by_query.update(zip((query for query, _ in remaining), finished))
+
+        for query, indexes in pending.items():
+            documents = documents_by_query[query]
+            self.result_cache.put(self._result_key(query, retrieve_k, final_n), documents)
+            for i in indexes:
+                results[i] = list(documents)
+        return results
+
+    def _result_key(self, query: str, retrieve_k: int, final_n: int) -> tuple:
+        # Whitespace only: case, backticks and punctuation change what the
+        # symbol and BM25 stages match, so `Payment` and "payment" differ
+        return (" ".join(query.split()), retrieve_k, final_n, self.index_version)
+
+    async def _embed_queries(self, texts: List[str]) -> Dict[str, List[float]]:
+        vectors: Dict[str, List[float]] = {}
+        missing = []
+        for text in dict.fromkeys(texts):
+            vector = self.query_embedding_cache.get(text)
+            if vector is None:
+                missing.append(text)
+            else:
+                vectors[text] = vector
+        if missing:
+            # One forward pass for the whole batch instead of one per query
+            computed = await asyncio.to_thread(self.embeddings.embed_documents, missing)
+            for text, vector in zip(missing, computed):
+                self.query_embedding_cache.put(text, vector)
+                vectors[text] = vector
+        return vectors
+
+    async def _search(self, query: str, retrieve_k: int, final_n: int) -> List[Document]:
+        symbol_documents, resolved = await self._symbol_stage(query, final_n)
+        if resolved is not None:
+            return resolved
+
         search_query = query
         if _contains_korean(query):
-            search_query = await _translate_query_to_english(query, self.llm)
+            search_query = await self._translate(query)
         
-        results = await asyncio.to_thread(
-            self.vectorstore.similarity_search_with_score,
-            query=search_query,
-            k=retrieve_k,
-        )
+        documents = await self._retrieve(search_query, self._embed_query(search_query), retrieve_k)
+        return await self._finish(search_query, documents, symbol_documents, final_n)
+
+    async def _symbol_stage(
+        self, query: str, final_n: int
+    ) -> Tuple[List[Document], Optional[List[Document]]]:
+        """Symbol index matches for `query`, and the final result when they alone answer it."""
+        identifiers = extract_identifiers(query) if settings.symbol_search else []
+        if not identifiers:
+            return [], None
+        symbol_documents = await asyncio.to_thread(self._lookup_symbols, identifiers)
+        resolved = {doc.metadata["symbol_match"] for doc in symbol_documents}
+        if (
+            resolved == set(identifiers)
+            and count_other_words(query, identifiers) <= settings.symbol_fast_path_max_words
+        ):
+            logger.info(
+                f"Resolved {', '.join(identifiers)} through the symbol index "
+                f"({len(symbol_documents)} documents)"
+            )
+            return symbol_documents, symbol_documents[:final_n]
+        return symbol_documents, None
+
+    async def _retrieve(
+        self, search_query: str, query_vector: Awaitable[List[float]], retrieve_k: int
+    ) -> List[Document]:
+        async def vector_search() -> List[List[Document]]:
+            vector = await query_vector
+            return await asyncio.gather(
+                *(asyncio.to_thread(shard.search, vector, retrieve_k) for shard in self.shards)
+            )
         
-        documents = []
-        for doc, score in results:
-            doc.metadata["similarity_score"] = score
-            documents.append(doc)
+        # BM25 needs no embedding, so it runs while the query is being embedded
+        vector_results, lexical_results = await asyncio.gather(
+            vector_search(),
+            asyncio.gather(
+                *(asyncio.to_thread(shard.search_lexical, search_query, retrieve_k) for shard in self.shards)
+            ),
+        )
+        ranked_lists = list(vector_results) + [result for result in lexical_results if result]
         
-        logger.info(f"Vector search returned {len(documents)} documents")
+        if len(ranked_lists) == 1:
+            documents = ranked_lists[0]
+        else:
+            documents = reciprocal_rank_fusion(
+                ranked_lists,
+                key=_document_key,
+                k=settings.rrf_k,
+                limit=retrieve_k,
+            )
         
+        logger.info(
+            f"Search returned {len(documents)} documents from {len(self.shards)} collections "
+            f"({sum(len(result) for result in lexical_results)} lexical hits)"
+        )
+        return documents
+
+    async def _finish(
+        self,
+        search_query: str,
+        documents: List[Document],
+        symbol_documents: List[Document],
+        final_n: int,
+    ) -> List[Document]:
         if len(documents) > final_n:
             documents = await asyncio.to_thread(
                 self._rerank_documents, search_query, documents, final_n
             )
-            logger.info(f"Reranked to top {len(documents)} documents")
+        
+        if symbol_documents:
+            # Defining chunks of named symbols go first, ahead of similar code,
+            # but leave at least half of the results to the vector search
+            symbol_documents = symbol_documents[: max(final_n // 2, 1)]
+            seen = {_document_key(doc) for doc in symbol_documents}
+            documents = symbol_documents + [
+                doc for doc in documents if _document_key(doc) not in seen
+            ]
+            documents = documents[:final_n]
         
         return documents
 
-
 def get_search() -> CodebaseSearch:
     return CodebaseSearch()
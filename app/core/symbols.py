@@ -0,0 +1,143 @@
+"""Symbol table mapping Kotlin/Java declaration names to the chunks defining them.
+
+Questions that name a class or function directly ("what does
+`PaymentRepository` do") are answered from this table by exact lookup, which
+is both faster and more precise than a vector scan for code names.
+"""
+
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+from app.core.chunk_index import ChunkIndex
+
+SYMBOL_LANGUAGES = ("kotlin", "java")
+
+# ASCII only: Korean particles attach directly to names ("PaymentRepository는")
+_QUERY_TOKEN = re.compile(r"`([^`]+)`|([A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*)")
+_WORD = re.compile(r"\w+")
+
+
+def _looks_like_identifier(token: str) -> bool:
+    return bool(
+        "_" in token.strip("_")  # snake_case, SCREAMING_CASE
+        or re.search(r"[a-z][A-Z]", token)  # camelCase, PascalCase
+        or re.search(r"[A-Z]{2,}[a-z]", token)  # HTTPClient
+    )
+
+
+def extract_identifiers(query: str) -> List[str]:
+    """Code identifiers named in a (Korean or English) question."""
+    identifiers = []
+    for match in _QUERY_TOKEN.finditer(query):
+        quoted, bare = match.groups()
+        if quoted:
+            identifiers.append(quoted.strip().rstrip("()"))
+        elif any(_looks_like_identifier(part) for part in bare.split(".")):
+            identifiers.append(bare)
+    return list(dict.fromkeys(identifier for identifier in identifiers if identifier))
+
+
+def count_other_words(query: str, identifiers: Iterable[str]) -> int:
+    """Number of words in `query` besides the identifiers themselves."""
+    remaining = query
+    for identifier in identifiers:
+        remaining = remaining.replace(identifier, " ")
+    return len(_WORD.findall(remaining))
+
+
+class SymbolIndex(ChunkIndex):
+    """Name -> chunk id table of Kotlin/Java declarations, kept in sync by the indexer.
+
+    Only the chunker's `symbols` metadata is indexed: the declarations a chunk
+    defines, not every name written in it, so a ViewModel injecting
+    `paymentRepository: PaymentRepository` is not a hit for the repository.
+    Names keep their case; a lookup also matches other casings, ranked after
+    the exact ones. Qualified names (`Outer.member`) are also reachable by
+    their last segment and by their owner, so looking up a class returns its
+    member chunks too, ranked after the chunk that declares it.
+    """
+
+    # 2: declaration metadata only, case-preserving keys
+    VERSION = 2
+    NAME = "symbols"
+
+    def __init__(self, path):
+        super().__init__(path)
+        # chunk id -> declared names, the chunk's primary symbol first
+        self.chunks: Dict[str, List[str]] = {}
+        # key -> [(chunk id, rank)], rank 0 = declares it, 1 = member
+        self._keys: Dict[str, List[Tuple[str, int]]] = {}
+        # lowercased key -> keys with that spelling
+        self._folded: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _restore(self, data: Dict) -> None:
+        for chunk_id, names in data.get("chunks", {}).items():
+            self._insert(chunk_id, names)
+
+    def _dump(self) -> Dict:
+        return {"chunks": self.chunks}
+
+    def _keys_for(self, name: str) -> List[Tuple[str, int]]:
+        keys = [(name, 0)]
+        if "." in name:
+            owner, _, member = name.rpartition(".")
+            keys.append((member, 0))
+            keys.append((owner, 1))
+        return keys
+
+    def _insert(self, chunk_id: str, names: List[str]) -> None:
+        self.chunks[chunk_id] = names
+        for name in names:
+            for key, rank in self._keys_for(name):
+                entries = self._keys.setdefault(key, [])
+                if (chunk_id, rank) not in entries:
+                    entries.append((chunk_id, rank))
+                self._folded.setdefault(key.lower(), set()).add(key)
+
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict]) -> None:
+        self.remove(ids)
+        for chunk_id, metadata in zip(ids, metadatas):
+            if metadata.get("language") not in SYMBOL_LANGUAGES:
+                continue
+            names = [name for name in (metadata.get("symbols") or "").split(",") if name]
+            if names:
+                self._insert(chunk_id, list(dict.fromkeys(names)))
+
+    def remove(self, ids: Iterable[str]) -> None:
+        for chunk_id in ids:
+            names = self.chunks.pop(chunk_id, None)
+            if not names:
+                continue
+            for name in names:
+                for key, _ in self._keys_for(name):
+                    entries = [entry for entry in self._keys.get(key, []) if entry[0] != chunk_id]
+                    if entries:
+                        self._keys[key] = entries
+                        continue
+                    self._keys.pop(key, None)
+                    spellings = self._folded.get(key.lower())
+                    if spellings is not None:
+                        spellings.discard(key)
+                        if not spellings:
+                            del self._folded[key.lower()]
+
+    def lookup(self, identifier: str, limit: int = 10) -> List[str]:
+        """Chunk ids for `identifier`: exact-case matches first, then declaring chunks."""
+        entries = [
+            (chunk_id, rank, 0 if key == identifier else 1)
+            for key in self._folded.get(identifier.lower(), ())
+            for chunk_id, rank in self._keys[key]
+        ]
+        member = identifier.rsplit(".", 1)[-1]
+
+        def sort_key(entry: Tuple[str, int, int]) -> Tuple[int, int, int]:
+            chunk_id, rank, case = entry
+            names = self.chunks.get(chunk_id, [])
+            primary = bool(names) and names[0].rsplit(".", 1)[-1] == member
+            return case, rank, 0 if primary else 1
+
+        ordered = sorted(entries, key=sort_key)
+        return list(dict.fromkeys(chunk_id for chunk_id, _, _ in ordered))[:limit]
@@ -0,0 +1,39 @@
+import logging
+from pathlib import Path
+
+from chromadb.api.shared_system_client import SharedSystemClient
+from langchain_chroma import Chroma
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+def open_vectorstore(persist_dir: Path, collection_name: str, embeddings: Embeddings) -> Chroma:
+    return Chroma(
+        collection_name=collection_name,
+        embedding_function=embeddings,
+        persist_directory=str(persist_dir),
+    )
+
+
+def distance_space(vectorstore: Chroma) -> str:
+    """The collection's distance function (hnsw:space): l2 unless it was created otherwise."""
+    metadata = getattr(vectorstore._collection, "metadata", None) or {}
+    return metadata.get("hnsw:space", "l2")
+
+
+def close_vectorstore(vectorstore: Chroma) -> None:
+    """Release the sqlite handles and loaded segments behind a persistent Chroma client.
+
+    chromadb keeps one System per persist directory in a process-wide cache,
+    so dropping the client object alone keeps every superseded index version
+    in memory, and its files open, for the life of the process.
+    """
+    identifier = getattr(vectorstore._client, "_identifier", None)
+    system = SharedSystemClient._identifier_to_system.pop(identifier, None)
+    if system is None:
+        return
+    try:
+        system.stop()
+    except Exception as e:
+        logger.warning(f"Failed to close Chroma client for {identifier}: {e}")
@@ -0,0 +1,316 @@
+import json
+import logging
+import os
+import shutil
+import socket
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LEGACY_VERSION = "legacy"
+
+# _IOW(0x94, 9, int) from linux/fs.h
+_FICLONE = 0x40049409
+
+
+# Device id -> whether FICLONE worked there, learned from the first clone
+_reflink_devices: Dict[int, bool] = {}
+
+
+def reflink_supported(path: Path) -> Optional[bool]:
+    """Whether clones into `path`'s filesystem were copy-on-write; None before the first one."""
+    try:
+        return _reflink_devices.get(os.stat(path).st_dev)
+    except OSError:
+        return None
+
+
+def clone_file(src: str, dst: str) -> str:
+    """copytree() copy function that clones files copy-on-write where possible.
+
+    On btrfs, XFS (reflink=1) and other filesystems with FICLONE support the
+    copy shares the source's blocks and costs only metadata, so copying the
+    live version for an incremental build no longer scales with index size.
+    Elsewhere (ext4, most network filesystems) it falls back to a full copy,
+    which is logged once per filesystem.
+    """
+    if fcntl is not None and sys.platform.startswith("linux"):
+        device = os.stat(os.path.dirname(dst)).st_dev
+        if _reflink_devices.get(device, True):
+            try:
+                with open(src, "rb") as source, open(dst, "wb") as target:
+                    fcntl.ioctl(target.fileno(), _FICLONE, source.fileno())
+                shutil.copystat(src, dst)
+                _reflink_devices[device] = True
+                return dst
+            except OSError as e:
+                if device not in _reflink_devices:
+                    logger.warning(
+                        f"The filesystem of {os.path.dirname(dst)} cannot clone files copy-on-write "
+                        f"({e.strerror}): every incremental build, each --watch rebuild included, "
+                        f"makes a full copy of the live index version"
+                    )
+                _reflink_devices[device] = False
+    return shutil.copy2(src, dst)
+
+
+@dataclass
+class IndexVersion:
+    version: str
+    path: Path
+
+
+class VersionPin:
+    """Shared lock a reader holds on a version directory while serving it.
+
+    prune() takes the lock exclusively before deleting a version, so a version
+    pinned by any process (an API worker that has not reloaded yet, or is still
+    finishing queries on it) is kept. The lock dies with its process.
+    """
+
+    def __init__(self, fd: Optional[int] = None):
+        self._fd = fd
+
+    def release(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class IndexVersions:
+    """Blue/green index directories for one collection.
+
+    Every build writes into a fresh directory under
+    `<chroma_db_path>/versions/<collection>/` and is promoted by atomically
+    replacing the CURRENT pointer file, so readers never see a half-built
+    index. Collections built before versioning keep working from the legacy
+    location until their first versioned build.
+    """
+
+    POINTER_NAME = "CURRENT"
+    # Points at an unfinished build that can be resumed
+    BUILDING_NAME = "BUILDING"
+    # Held exclusively for the whole of a build (see build_lock)
+    LOCK_NAME = "BUILD.lock"
+    # Inside each version directory, locked by readers (see VersionPin)
+    PIN_NAME = ".readers.lock"
+    # Versions being deleted are renamed first so readers can tell they are gone
+    TRASH_PREFIX = ".trash-"
+
+    def __init__(self, root: Path, collection_name: str):
+        self.root = root
+        self.collection_name = collection_name
+        self.base = root / "versions" / collection_name
+        self.pointer_path = self.base / self.POINTER_NAME
+        self.building_path = self.base / self.BUILDING_NAME
+
+    def _read_pointer(self, path: Path) -> Optional[IndexVersion]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable index pointer {path}: {e}")
+            return None
+        return IndexVersion(version=data["version"], path=self.base / data["path"])
+
+    def _write_pointer(self, path: Path, version: IndexVersion, **extra) -> None:
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": version.version, "path": version.path.name, **extra}, f)
+        os.replace(tmp_path, path)
+
+    @contextmanager
+    def build_lock(self) -> Iterator[None]:
+        """Run one build of this collection at a time, across processes.
+
+        A second build (a cron job next to the --watch daemon) waits here
+        until the first one finishes, instead of taking its BUILDING version
+        for an interrupted one and discarding it mid-write, or copying the
+        same live version and dropping the other's changes when it promotes.
+        The lock dies with its process, so a killed build leaves a BUILDING
+        version that the next build resumes or discards.
+        """
+        self.base.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(self.base / self.LOCK_NAME, "a+", encoding="utf-8") as f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                f.seek(0)
+                owner = f.read().strip() or "another process"
+                logger.warning(f"Another build of {self.collection_name} is running ({owner}), waiting for it")
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            f.seek(0)
+            f.truncate()
+            f.write(f"pid {os.getpid()} on {socket.gethostname()}, started {datetime.now().isoformat(timespec='seconds')}")
+            f.flush()
+            yield
+
+    def current(self) -> Optional[IndexVersion]:
+        return self._read_pointer(self.pointer_path)
+
+    def building(self) -> Optional[IndexVersion]:
+        version = self._read_pointer(self.building_path)
+        if version is not None and not version.path.exists():
+            return None
+        return version
+
+    def active(self) -> IndexVersion:
+        current = self.current()
+        if current is not None:
+            return current
+        return IndexVersion(version=LEGACY_VERSION, path=self.root)
+
+    def pointer_mtime(self) -> Optional[float]:
+        try:
+            return self.pointer_path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def create(self, copy_from: Optional[Path] = None) -> IndexVersion:
+        # Sortable by creation time, which prune() relies on
+        version = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{uuid.uuid4().hex[:4]}"
+        path = self.base / version
+        self.base.mkdir(parents=True, exist_ok=True)
+
+        if copy_from is not None and copy_from.exists():
+            logger.info(f"Copying index {copy_from} -> {path}")
+            started = time.perf_counter()
+            # The legacy root also holds the versions/ tree itself
+            shutil.copytree(
+                copy_from,
+                path,
+                ignore=shutil.ignore_patterns("versions", self.PIN_NAME),
+                copy_function=clone_file,
+            )
+            method = "copy-on-write" if reflink_supported(path) else "full copy"
+            logger.info(f"Copied index version in {time.perf_counter() - started:.2f}s ({method})")
+        else:
+            path.mkdir(parents=True)
+        (path / self.PIN_NAME).touch()
+        return IndexVersion(version=version, path=path)
+
+    def pin(self, version: IndexVersion) -> Optional[VersionPin]:
+        """Keep `version` from being pruned until the pin is released.
+
+        Returns None when the version has been deleted, or is being deleted.
+        """
+        if fcntl is None or version.version == LEGACY_VERSION:
+            return VersionPin()
+        lock_path = version.path / self.PIN_NAME
+        try:
+            fd = os.open(lock_path, os.O_RDONLY | os.O_CREAT, 0o644)
+        except FileNotFoundError:
+            return None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            # prune() renames the directory while it holds the lock, so the lock
+            # file still being at its path means the version was not deleted
+            if os.stat(lock_path).st_ino != os.fstat(fd).st_ino:
+                raise FileNotFoundError(lock_path)
+        except OSError:
+            os.close(fd)
+            return None
+        return VersionPin(fd)
+
+    def _remove_unpinned(self, path: Path) -> bool:
+        """Delete a version directory unless a reader has it pinned."""
+        if fcntl is not None:
+            try:
+                fd = os.open(path / self.PIN_NAME, os.O_RDONLY | os.O_CREAT, 0o644)
+            except FileNotFoundError:
+                return False
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+            try:
+                trash = path.with_name(self.TRASH_PREFIX + path.name)
+                os.replace(path, trash)
+            finally:
+                os.close(fd)
+            path = trash
+        shutil.rmtree(path, ignore_errors=True)
+        return True
+
+    def mark_building(self, version: IndexVersion) -> None:
+        self._write_pointer(self.building_path, version, started_at=time.time())
+
+    def _clear_building(self, version: IndexVersion) -> None:
+        building = self._read_pointer(self.building_path)
+        if building is not None and building.version == version.version:
+            self.building_path.unlink(missing_ok=True)
+
+    def promote(self, version: IndexVersion) -> None:
+        current = self.current()
+        self._write_pointer(
+            self.pointer_path,
+            version,
+            promoted_at=time.time(),
+            # prune() keeps it: API workers reload on a timer and may still serve it
+            previous=current.path.name if current is not None else None,
+        )
+        self._clear_building(version)
+        logger.info(f"Promoted index version {version.version}")
+
+    def discard(self, version: IndexVersion) -> None:
+        self._clear_building(version)
+        shutil.rmtree(version.path, ignore_errors=True)
+
+    def _previous(self) -> Optional[str]:
+        try:
+            with open(self.pointer_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("previous")
+        except (OSError, ValueError):
+            return None
+
+    def _version_dirs(self) -> List[Path]:
+        if not self.base.exists():
+            return []
+        return sorted(
+            path for path in self.base.iterdir() if path.is_dir() and not path.name.startswith(".")
+        )
+
+    def prune(self, keep: int) -> None:
+        """Delete old versions, keeping the newest `keep` (current included).
+
+        Never deletes the version the pointer replaced last, nor any version a
+        reader still has pinned: an API worker only notices a promotion on its
+        next reload check, and queries that started on the old version finish
+        there. Those are retried by the next prune.
+        """
+        current = self.current()
+        building = self.building()
+        previous = self._previous()
+        dirs = self._version_dirs()
+        for path in dirs[: max(len(dirs) - keep, 0)]:
+            if current is not None and path == current.path:
+                continue
+            if building is not None and path == building.path:
+                continue
+            if path.name == previous:
+                continue
+            if self._remove_unpinned(path):
+                logger.info(f"Removed old index version {path.name}")
+            else:
+                logger.info(f"Keeping old index version {path.name}, still in use")
+        # Left behind by a prune that was interrupted mid-delete
+        for path in self.base.glob(self.TRASH_PREFIX + "*"):
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,67 @@
+import logging
+from pathlib import Path
+from typing import Optional
+
+from watchfiles import Change, watch
+
+from app.core.index import CodebaseIndexer
+
+logger = logging.getLogger(__name__)
+
+
+def watch_codebase(
+    indexer: CodebaseIndexer,
+    codebase_path: Path,
+    batch_size: int = 100,
+    debounce_ms: int = 2000,
+    since: Optional[str] = None,
+) -> None:
+    """Keep the live collection in sync with `codebase_path` until interrupted.
+
+    Runs one incremental build to catch up, then waits for filesystem events.
+    A burst of events (e.g. a branch checkout) is grouped until the tree has
+    been quiet for `debounce_ms`, and only the affected files are re-embedded.
+    """
+    codebase_path = codebase_path.resolve()
+    indexer.index_codebase(codebase_path, batch_size=batch_size, since=since)
+
+    def watch_filter(change: Change, path: str) -> bool:
+        try:
+            # Relative, like the walker: a codebase under e.g. ~/build/ is not skipped
+            file_path = Path(path).relative_to(codebase_path)
+        except ValueError:
+            return False
+        if indexer._should_skip_path(file_path):
+            return False
+        # Directories carry no suffix: a deleted one needs its chunks dropped,
+        # and one moved into the tree is the only event for the files inside
+        return (
+            change == Change.deleted
+            or indexer._is_indexable(file_path)
+            or (codebase_path / file_path).is_dir()
+        )
+
+    print(f"[WATCH] Watching {codebase_path} (debounce: {debounce_ms}ms)")
+    logger.info(f"Watching {codebase_path} for changes (debounce: {debounce_ms}ms)")
+
+    for changes in watch(
+        codebase_path,
+        watch_filter=watch_filter,
+        step=debounce_ms,
+        debounce=max(debounce_ms * 10, 30_000),
+    ):
+        changed_paths = sorted(
+            {indexer._relative_path(Path(path), codebase_path) for _, path in changes}
+        )
+        print(f"[WATCH] {len(changed_paths)} paths changed, updating index")
+        logger.info(f"{len(changed_paths)} paths changed, updating index")
+
+        try:
+            indexer.index_codebase(
+                codebase_path,
+                batch_size=batch_size,
+                changed_paths=changed_paths,
+            )
+        except Exception as e:
+            # Keep the daemon alive; the next event or a restart retries the files
+            logger.exception(f"Incremental update failed: {e}")
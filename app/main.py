@@ -1,5 +1,7 @@
 """FastAPI application for n8n Slack bot integration."""
 
+import asyncio
+import contextlib
 import logging
 import sys
 from contextlib import asynccontextmanager
@@ -9,6 +11,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import ORJSONResponse
 
+from app.api.readiness import get_readiness
 from app.api.routes import router
 from app.config import settings
 
@@ -27,8 +30,14 @@ async def lifespan(app: FastAPI):
     logger.info(f"API Server: {settings.api_host}:{settings.api_port}")
     logger.info(f"Codebase Path: {settings.codebase_path}")
     logger.info(f"ChromaDB Path: {settings.chroma_db_path}")
+    # Load models and open the index in the background so the port opens
+    # immediately; /api/ready turns 200 once this finishes
+    warmup = asyncio.create_task(get_readiness().warm_up())
     yield
     logger.info("Shutting down Code Bot API")
+    warmup.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await warmup
 
 
 app = FastAPI(
@@ -7,6 +7,7 @@ from langchain.prompts import ChatPromptTemplate
 from langchain.schema import Document
 
 from app.config import settings
+from app.core.cache import SemanticAnswerCache
 from app.prompts import (
     CODEBASE_PROMPT,
     SECURITY_RESPONSE_PREFIX,
@@ -68,6 +69,11 @@ class CodebaseAnswerGenerator:
         self.keyword_template = ChatPromptTemplate.from_template(KEYWORD_EXTRACTION_PROMPT)
         self.relevance_template = ChatPromptTemplate.from_template(DOCUMENT_RELEVANCE_PROMPT)
         self.atlassian = get_atlassian_data_source()
+        self.answer_cache = SemanticAnswerCache(
+            max_entries=settings.answer_cache_entries,
+            ttl=settings.answer_cache_ttl,
+            threshold=settings.answer_cache_threshold,
+        )
         
         self._initialized = True
         logger.info("CodebaseAnswerGenerator initialization complete")
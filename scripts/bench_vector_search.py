@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""CLI script to benchmark quantized vector search against plain Chroma search."""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.config import settings
+from app.core.profiler import current_rss_mb
+from app.core.quantization import QuantizedIndex, quantized_index_path
+from app.core.versions import IndexVersions
+
+
+def setup_logging(log_level: str) -> None:
+    """Configure logging for the benchmark."""
+    logging.basicConfig(
+        level=getattr(logging, log_level.upper()),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+
+def percentile(values: List[float], q: float) -> float:
+    return round(float(np.percentile(values, q)), 2)
+
+
+def run_mode(collection_name: str, query_file: Path, k: int) -> Dict:
+    """Serve the queries the way the server does, in this (fresh) process."""
+    from app.core.search import IndexShard
+
+    queries = np.load(query_file)
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+    # Vectors are passed in, so the shard needs no embedding model
+    shard = IndexShard(collection_name, None)
+    open_ms = (time.perf_counter() - started) * 1000
+
+    latencies: List[float] = []
+    results: List[List[str]] = []
+    for query in queries:
+        started = time.perf_counter()
+        documents = shard.search(query.tolist(), k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append(
+            [f"{document.metadata.get('file_path')}#{document.metadata.get('chunk_index')}" for document in documents]
+        )
+
+    return {
+        "open_ms": round(open_ms, 1),
+        # The first query loads whatever the search path needs
+        "first_query_ms": round(latencies[0], 2),
+        "p50_ms": percentile(latencies[1:] or latencies, 50),
+        "p95_ms": percentile(latencies[1:] or latencies, 95),
+        "rss_before_mb": rss_before,
+        "rss_after_mb": current_rss_mb(),
+        "results": results,
+    }
+
+
+def bench(collection_name: str, quantization: str, query_file: Path, k: int) -> Dict:
+    """Run one mode in a child process, so each starts from a cold, unshared Chroma client."""
+    env = dict(
+        os.environ,
+        VECTOR_QUANTIZATION=quantization,
+        # Side indexes load the same in both modes; leave them out of the comparison
+        SYMBOL_SEARCH="false",
+        HYBRID_SEARCH="false",
+    )
+    output = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "--collection",
+            collection_name,
+            "--k",
+            str(k),
+            "--run-mode",
+            str(query_file),
+        ],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    """Main entry point for the benchmark."""
+    parser = argparse.ArgumentParser(
+        description="Compare quantized vector search with plain Chroma search on the live "
+        "index version (latency, memory and overlap of the results).",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  VECTOR_QUANTIZATION=int8 python scripts/build_index.py --reset
+  python scripts/bench_vector_search.py
+  python scripts/bench_vector_search.py --queries 500 --k 50
+        """,
+    )
+    parser.add_argument(
+        "--collection",
+        type=str,
+        default=settings.collection_name,
+        help=f"Collection to benchmark (default: {settings.collection_name})",
+    )
+    parser.add_argument(
+        "--queries",
+        type=int,
+        default=200,
+        help="Number of stored vectors used as queries (default: 200)",
+    )
+    parser.add_argument(
+        "--k",
+        type=int,
+        default=settings.retrieve_top_k,
+        help=f"Results per query (default: RETRIEVE_TOP_K={settings.retrieve_top_k})",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed for sampling queries (default: 0)",
+    )
+    parser.add_argument("--run-mode", type=str, default=None, help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--log-level",
+        type=str,
+        default=settings.log_level,
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help=f"Logging level (default: {settings.log_level})",
+    )
+
+    args = parser.parse_args()
+
+    if args.run_mode is not None:
+        logging.basicConfig(level=logging.WARNING, handlers=[logging.StreamHandler(sys.stderr)])
+        print(json.dumps(run_mode(args.collection, Path(args.run_mode), args.k)))
+        return 0
+
+    setup_logging(args.log_level)
+    logger = logging.getLogger(__name__)
+
+    version = IndexVersions(settings.chroma_db_path, args.collection).active()
+    quantized = QuantizedIndex.load(quantized_index_path(version.path, args.collection))
+    if quantized is None:
+        logger.error(
+            f"No quantized index in {version.path}; build with VECTOR_QUANTIZATION=int8 "
+            f"(or binary) first"
+        )
+        return 1
+
+    rng = np.random.default_rng(args.seed)
+    rows = np.sort(rng.choice(len(quantized), size=min(args.queries, len(quantized)), replace=False))
+    queries = np.asarray(quantized.vectors[rows], dtype=np.float32)
+    kind = quantized.kind
+    del quantized
+
+    with tempfile.TemporaryDirectory() as tmp:
+        query_file = Path(tmp) / "queries.npy"
+        np.save(query_file, queries)
+        logger.info(f"Benchmarking {len(queries)} queries, k={args.k}, index version {version.version}")
+        baseline = bench(args.collection, "none", query_file, args.k)
+        candidate = bench(args.collection, kind, query_file, args.k)
+
+    overlap = [
+        len(set(a) & set(b)) / max(len(a), 1)
+        for a, b in zip(baseline.pop("results"), candidate.pop("results"))
+    ]
+
+    logger.info("=" * 60)
+    for name, result in (("chroma", baseline), (kind, candidate)):
+        logger.info(
+            f"{name:<10} p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, "
+            f"first query {result['first_query_ms']} ms, "
+            f"RSS {result['rss_before_mb']} -> {result['rss_after_mb']} MB"
+        )
+    logger.info(f"Results shared with chroma: {np.mean(overlap):.3f} of top {args.k}")
+    logger.info("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
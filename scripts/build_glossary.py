@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""CLI script to build the Korean -> English query glossary from the codebase."""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.config import settings
+from app.core.cache import TranslationCache
+from app.core.glossary import GlossaryBuilder
+from app.core.index import CodebaseIndexer
+from app.core.walker import FileWalker
+
+
+def setup_logging(log_level: str) -> None:
+    """Configure logging for the glossary build."""
+    logging.basicConfig(
+        level=getattr(logging, log_level.upper()),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+
+def main() -> int:
+    """Main entry point for the glossary build."""
+    parser = argparse.ArgumentParser(
+        description="Build the Korean -> English glossary used to translate questions "
+        "without the LLM, from string resources, comments, markdown and past translations.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python scripts/build_glossary.py
+  python scripts/build_glossary.py --codebase-path /path/to/android-app --no-translations
+        """,
+    )
+    parser.add_argument(
+        "--codebase-path",
+        type=str,
+        default=str(settings.codebase_path),
+        help=f"Codebase to mine (default: {settings.codebase_path})",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=str(settings.glossary_path),
+        help=f"Glossary file to write (default: {settings.glossary_path})",
+    )
+    parser.add_argument(
+        "--no-translations",
+        action="store_true",
+        help="Do not learn from cached LLM translations (TRANSLATION_CACHE_PATH)",
+    )
+    parser.add_argument(
+        "--min-count",
+        type=float,
+        default=2.0,
+        help="Minimum co-occurrence count for a Korean/English word pair (default: 2)",
+    )
+    parser.add_argument(
+        "--max-terms",
+        type=int,
+        default=3,
+        help="English terms kept per Korean term (default: 3)",
+    )
+    parser.add_argument(
+        "--log-level",
+        type=str,
+        default=settings.log_level,
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help=f"Logging level (default: {settings.log_level})",
+    )
+
+    args = parser.parse_args()
+
+    setup_logging(args.log_level)
+    logger = logging.getLogger(__name__)
+
+    codebase_path = Path(args.codebase_path)
+    if not codebase_path.is_dir():
+        logger.error(f"Codebase path is not a directory: {codebase_path}")
+        return 1
+
+    builder = GlossaryBuilder()
+    walker = FileWalker(
+        root=codebase_path,
+        skip_dirs=CodebaseIndexer.SKIP_DIRS,
+        extensions=CodebaseIndexer.INDEXABLE_EXTENSIONS.keys(),
+        skip_suffixes=CodebaseIndexer.SKIP_PATTERNS,
+    )
+    for file_path in walker.walk():
+        try:
+            content = file_path.read_text(encoding="utf-8", errors="ignore")
+        except OSError as e:
+            logger.warning(f"Skipping unreadable file {file_path}: {e}")
+            continue
+        builder.add_file(str(file_path.relative_to(codebase_path)), content)
+
+    if not args.no_translations and settings.translation_cache_path.exists():
+        cache = TranslationCache(
+            path=settings.translation_cache_path,
+            model_name=settings.llm_model,
+            ttl=settings.translation_cache_ttl,
+            memory_entries=0,
+            max_entries=settings.translation_cache_max_entries,
+        )
+        for question, translation in cache.entries():
+            builder.add_translation(question, translation)
+        cache.close()
+
+    glossary = builder.build(min_count=args.min_count, max_terms=args.max_terms)
+    output = Path(args.output)
+    glossary.save(output, codebase_path=str(codebase_path), sources=dict(builder.sources))
+
+    logger.info("=" * 60)
+    logger.info(f"Glossary: {len(glossary)} terms -> {output}")
+    logger.info(f"Sources: {dict(builder.sources)}")
+    for term, english in list(glossary.terms.items())[:20]:
+        logger.info(f"  {term} -> {', '.join(english)}")
+    logger.info("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,7 +11,6 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from app.config import settings
-from app.core.index import CodebaseIndexer
 
 
 def setup_logging(log_level: str) -> None:
@@ -23,6 +22,42 @@ def setup_logging(log_level: str) -> None:
     )
 
 
+def parse_shard(value: str) -> tuple:
+    """Parse a NAME=PATH shard argument."""
+    name, sep, path = value.partition("=")
+    if not sep or not name or not path:
+        raise argparse.ArgumentTypeError(f"expected NAME=PATH, got '{value}'")
+    return name, Path(path)
+
+
+def log_summary(logger: logging.Logger, stats: dict) -> None:
+    """Log the stats returned by one index build."""
+    logger.info(f"Files processed: {stats['files_processed']}")
+    logger.info(f"Files skipped: {stats['files_skipped']}")
+    logger.info(f"Files added: {stats['files_added']}")
+    logger.info(f"Files updated: {stats['files_updated']}")
+    logger.info(f"Files deleted: {stats['files_deleted']}")
+    logger.info(f"Files unchanged: {stats['files_unchanged']}")
+    logger.info(f"Chunks created: {stats['chunks_created']}")
+    logger.info(f"Resumed: {stats['resumed']} ({stats['checkpoints_saved']} checkpoints saved)")
+    logger.info(f"Walk time: {stats['walk_seconds']}s")
+    logger.info(f"Embedding cache hits: {stats['embedding_cache_hits']}")
+    logger.info(f"Embedding throughput: {stats['chunks_per_second']} chunks/s")
+    logger.info(f"Embedding padding ratio: {stats['embedding_padding_ratio']}")
+    quantization = stats.get("quantization")
+    if quantization and quantization.get("vectors"):
+        logger.info(
+            f"Quantized index: {quantization['kind']}, {quantization['compression']}x smaller, "
+            f"recall@{quantization['k']} {quantization['recall_first_pass']} first pass / "
+            f"{quantization['recall_rescored']} rescored"
+        )
+    logger.info(f"Last indexed commit: {stats['last_commit']}")
+    logger.info(f"Collection: {stats['collection_name']}")
+    logger.info(f"Persist directory: {stats['persist_directory']}")
+    if "profile_report" in stats:
+        logger.info(f"Profile report: {stats['profile_report']}")
+
+
 def main() -> int:
     """Main entry point for the indexing CLI."""
     parser = argparse.ArgumentParser(
@@ -33,6 +68,13 @@ Examples:
   python scripts/build_index.py
   python scripts/build_index.py --codebase-path /path/to/project
   python scripts/build_index.py --reset  # Clear and rebuild index
+  python scripts/build_index.py          # Re-embed only added/changed files
+  python scripts/build_index.py --since  # Ask git for changes since last build
+  python scripts/build_index.py --since origin/main~10
+  python scripts/build_index.py --watch  # Keep the index live as files change
+  python scripts/build_index.py --shard app=/src/app --shard libs=/src/libs
+  python scripts/build_index.py --resume # Continue an interrupted build
+  python scripts/build_index.py --profile  # Write a per-stage timing report
         """,
     )
     parser.add_argument(
@@ -44,7 +86,64 @@ Examples:
     parser.add_argument(
         "--reset",
         action="store_true",
-        help="Clear existing index before rebuilding",
+        help="Clear existing index before rebuilding (default: incremental update)",
+    )
+    parser.add_argument(
+        "--since",
+        type=str,
+        nargs="?",
+        const="last",
+        default=None,
+        metavar="COMMIT",
+        help="Only index files git reports as changed since COMMIT "
+        "(default with no value: last indexed commit)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the last interrupted build from its checkpoint "
+        "(starts a new build if there is none)",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=10,
+        help="Save a resumable checkpoint every N written batches; 0 disables "
+        "checkpoints and discards interrupted builds (default: 10)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        action="append",
+        default=[],
+        metavar="NAME=PATH",
+        help="Index PATH into collection NAME; repeat to build several shards in "
+        "parallel (replaces --codebase-path)",
+    )
+    parser.add_argument(
+        "--parallel-shards",
+        type=int,
+        default=2,
+        help="Shards built at the same time with --shard (default: 2)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Run as a daemon that re-embeds files as they change",
+    )
+    parser.add_argument(
+        "--debounce-ms",
+        type=int,
+        default=2000,
+        help="Quiet period before a burst of changes is indexed in --watch mode "
+        "(default: 2000)",
+    )
+    parser.add_argument(
+        "--ignore-file",
+        type=str,
+        default=None,
+        help="Extra gitignore-style file applied at the codebase root "
+        "(.gitignore and .codebotignore are always honored)",
     )
     parser.add_argument(
         "--chunk-size",
@@ -52,17 +151,49 @@ Examples:
         default=1000,
         help="Maximum chunk size in characters (default: 1000)",
     )
+    parser.add_argument(
+        "--chunk-strategy",
+        type=str,
+        default="declaration",
+        choices=["declaration", "recursive"],
+        help="declaration: one chunk per Kotlin/Java declaration, small siblings "
+        "merged; recursive: plain character splitting (default: declaration)",
+    )
     parser.add_argument(
         "--chunk-overlap",
         type=int,
         default=200,
-        help="Chunk overlap in characters (default: 200)",
+        help="Chunk overlap in characters; declaration chunks only overlap when a "
+        "single declaration is split (default: 200)",
     )
     parser.add_argument(
         "--batch-size",
         type=int,
         default=100,
-        help="Batch size for adding documents (default: 100)",
+        help="Chunks per vector store write (default: 100)",
+    )
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        default=16384,
+        help="Padded tokens per embedding forward pass; chunks are bucketed "
+        "by token length to fill it (default: 16384)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to read and split files (default: 1)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        nargs="?",
+        const="./data/profiles",
+        default=None,
+        metavar="PATH",
+        help="Record per-stage time, throughput and RSS and write a JSON "
+        "report to PATH (a .json file or a directory, default: ./data/profiles)",
     )
     parser.add_argument(
         "--log-level",
@@ -74,53 +205,118 @@ Examples:
 
     args = parser.parse_args()
 
+    # Imported here, not at module level: --workers spawns processes that
+    # re-import this script, and they only need the chunker
+    from app.core.index import CodebaseIndexer, index_shards
+    from app.core.watch import watch_codebase
+
     # Setup logging
     setup_logging(args.log_level)
     logger = logging.getLogger(__name__)
 
-    # Validate codebase path
+    # Validate codebase paths
     codebase_path = Path(args.codebase_path)
-    if not codebase_path.exists():
-        logger.error(f"Codebase path does not exist: {codebase_path}")
-        return 1
+    shards = dict(args.shard)
+    for path in shards.values() if shards else [codebase_path]:
+        if not path.exists():
+            logger.error(f"Codebase path does not exist: {path}")
+            return 1
 
-    if not codebase_path.is_dir():
-        logger.error(f"Codebase path is not a directory: {codebase_path}")
+        if not path.is_dir():
+            logger.error(f"Codebase path is not a directory: {path}")
+            return 1
+
+    if shards and args.watch:
+        logger.error("--watch cannot be combined with --shard")
         return 1
 
     logger.info("=" * 60)
     logger.info("Codebase Indexer")
     logger.info("=" * 60)
-    logger.info(f"Codebase path: {codebase_path}")
+    if shards:
+        for name, path in shards.items():
+            logger.info(f"Shard: {name} <- {path}")
+        logger.info(f"Parallel shards: {args.parallel_shards}")
+    else:
+        logger.info(f"Codebase path: {codebase_path}")
     logger.info(f"Reset index: {args.reset}")
+    logger.info(f"Resume: {args.resume}")
+    logger.info(f"Since commit: {args.since}")
     logger.info(f"Chunk size: {args.chunk_size}")
+    logger.info(f"Chunk strategy: {args.chunk_strategy}")
     logger.info(f"Chunk overlap: {args.chunk_overlap}")
     logger.info(f"Batch size: {args.batch_size}")
+    logger.info(f"Token budget: {args.token_budget}")
+    logger.info(f"Workers: {args.workers}")
+    logger.info(f"Embedding device: {settings.embedding_device}")
     logger.info("=" * 60)
 
+    indexer_options = {
+        "chunk_size": args.chunk_size,
+        "chunk_overlap": args.chunk_overlap,
+        "workers": args.workers,
+        "token_budget": args.token_budget,
+        "ignore_file": Path(args.ignore_file) if args.ignore_file else None,
+        "chunk_strategy": args.chunk_strategy,
+    }
+
     try:
+        if shards:
+            results = index_shards(
+                shards,
+                parallel=args.parallel_shards,
+                indexer_options=indexer_options,
+                reset=args.reset,
+                batch_size=args.batch_size,
+                since=args.since,
+                checkpoint_every=args.checkpoint_every,
+                resume=args.resume,
+                profile_path=args.profile,
+            )
+
+            logger.info("=" * 60)
+            logger.info("Indexing Complete!")
+            for name in shards:
+                logger.info("=" * 60)
+                log_summary(logger, results[name])
+            logger.info("=" * 60)
+            return 0
+
         # Create indexer
-        indexer = CodebaseIndexer(
-            chunk_size=args.chunk_size,
-            chunk_overlap=args.chunk_overlap,
-        )
+        indexer = CodebaseIndexer(**indexer_options)
+
+        if args.watch:
+            if args.reset:
+                logger.error("--watch cannot be combined with --reset")
+                return 1
+            try:
+                watch_codebase(
+                    indexer,
+                    codebase_path,
+                    batch_size=args.batch_size,
+                    debounce_ms=args.debounce_ms,
+                    since=args.since,
+                )
+            except KeyboardInterrupt:
+                logger.info("Watch mode stopped")
+            return 0
 
         # Run indexing
         stats = indexer.index_codebase(
             codebase_path=codebase_path,
             reset=args.reset,
             batch_size=args.batch_size,
+            since=args.since,
+            checkpoint_every=args.checkpoint_every,
+            resume=args.resume,
+            profile_path=args.profile,
         )
 
         # Print summary
         logger.info("=" * 60)
         logger.info("Indexing Complete!")
         logger.info("=" * 60)
-        logger.info(f"Files processed: {stats['files_processed']}")
-        logger.info(f"Files skipped: {stats['files_skipped']}")
-        logger.info(f"Chunks created: {stats['chunks_created']}")
-        logger.info(f"Collection: {stats['collection_name']}")
-        logger.info(f"Persist directory: {stats['persist_directory']}")
+        log_summary(logger, stats)
         logger.info("=" * 60)
 
         return 0
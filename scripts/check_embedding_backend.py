@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""CLI script to check an embedding backend against the PyTorch reference."""
+
+import argparse
+import logging
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.config import settings
+from app.core.chunking import CodeChunker
+from app.core.embeddings import EMBEDDING_BACKENDS, get_embeddings
+from app.core.index import CodebaseIndexer
+from app.core.walker import FileWalker
+
+
+def setup_logging(log_level: str) -> None:
+    """Configure logging for the check."""
+    logging.basicConfig(
+        level=getattr(logging, log_level.upper()),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+
+def sample_chunks(codebase_path: Path, count: int, seed: int) -> List[str]:
+    """Pick random chunks from the codebase, chunked like the indexer does."""
+    walker = FileWalker(
+        root=codebase_path,
+        skip_dirs=CodebaseIndexer.SKIP_DIRS,
+        extensions=CodebaseIndexer.INDEXABLE_EXTENSIONS.keys(),
+        skip_suffixes=CodebaseIndexer.SKIP_PATTERNS,
+    )
+    files = list(walker.walk())
+    random.Random(seed).shuffle(files)
+
+    chunker = CodeChunker()
+    texts: List[str] = []
+    for file_path in files:
+        content = file_path.read_text(encoding="utf-8", errors="ignore")
+        if not content.strip():
+            continue
+        relative_path = str(file_path.relative_to(codebase_path))
+        texts.extend(chunk.text for chunk in chunker.chunk(content, file_path, codebase_path, relative_path))
+        if len(texts) >= count:
+            break
+    return texts[:count]
+
+
+def cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def timed_embed(embeddings, texts: List[str], queries: List[str]) -> tuple:
+    embeddings.embed_documents(texts[:2])  # warm-up
+    started = time.perf_counter()
+    documents = embeddings.embed_documents(texts)
+    document_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    query_vectors = [embeddings.embed_query(query) for query in queries]
+    query_ms = (time.perf_counter() - started) * 1000 / max(len(queries), 1)
+    return documents + query_vectors, document_seconds, query_ms
+
+
+def main() -> int:
+    """Main entry point for the backend check."""
+    parser = argparse.ArgumentParser(
+        description="Compare an embedding backend with the PyTorch reference "
+        "(cosine similarity and latency).",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python scripts/check_embedding_backend.py --backend onnx-int8
+  python scripts/check_embedding_backend.py --backend onnx --tolerance 0.999
+        """,
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default=settings.embedding_backend if settings.embedding_backend != "torch" else "onnx-int8",
+        choices=[backend for backend in EMBEDDING_BACKENDS if backend != "torch"],
+        help="Backend to check (default: EMBEDDING_BACKEND, or onnx-int8 when it is torch)",
+    )
+    parser.add_argument(
+        "--codebase-path",
+        type=str,
+        default=str(settings.codebase_path),
+        help=f"Codebase to sample chunks from (default: {settings.codebase_path})",
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=200,
+        help="Number of chunks to embed with both backends (default: 200)",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.99,
+        help="Minimum cosine similarity to the torch vector for every sample "
+        "(default: 0.99)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed for sampling (default: 0)",
+    )
+    parser.add_argument(
+        "--log-level",
+        type=str,
+        default=settings.log_level,
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help=f"Logging level (default: {settings.log_level})",
+    )
+
+    args = parser.parse_args()
+
+    setup_logging(args.log_level)
+    logger = logging.getLogger(__name__)
+
+    codebase_path = Path(args.codebase_path)
+    if not codebase_path.is_dir():
+        logger.error(f"Codebase path is not a directory: {codebase_path}")
+        return 1
+
+    texts = sample_chunks(codebase_path, args.samples, args.seed)
+    if not texts:
+        logger.error(f"No indexable files found in {codebase_path}")
+        return 1
+    queries = [
+        "where is the login token refreshed",
+        "비밀번호 변경 팝업 노출 주기",
+        "RecyclerView adapter for the order list",
+        "how are push notifications routed",
+    ]
+
+    backend_embeddings = get_embeddings(backend=args.backend)
+    if backend_embeddings.model_kwargs.get("backend") != "onnx":
+        logger.error(f"Backend {args.backend} could not be loaded, see the warning above")
+        return 1
+
+    candidate, backend_seconds, backend_query_ms = timed_embed(backend_embeddings, texts, queries)
+    reference, torch_seconds, torch_query_ms = timed_embed(
+        get_embeddings(backend="torch"), texts, queries
+    )
+
+    similarities = [cosine(a, b) for a, b in zip(reference, candidate)]
+    worst = min(similarities)
+    mean = sum(similarities) / len(similarities)
+
+    logger.info("=" * 60)
+    logger.info(f"Backend: {args.backend} vs torch ({len(texts)} chunks, {len(queries)} queries)")
+    logger.info(f"Cosine similarity: min {worst:.5f}, mean {mean:.5f}")
+    logger.info(
+        f"Documents: torch {len(texts) / torch_seconds:.1f} chunks/s, "
+        f"{args.backend} {len(texts) / backend_seconds:.1f} chunks/s "
+        f"({torch_seconds / backend_seconds:.2f}x)"
+    )
+    logger.info(
+        f"Query latency: torch {torch_query_ms:.1f} ms, {args.backend} {backend_query_ms:.1f} ms"
+    )
+    logger.info("=" * 60)
+
+    if worst < args.tolerance:
+        logger.error(f"Minimum cosine similarity {worst:.5f} is below tolerance {args.tolerance}")
+        return 1
+    logger.info(f"All vectors within tolerance {args.tolerance}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
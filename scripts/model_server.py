@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""CLI script to run the embedding / reranking server shared by API workers."""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from flashrank import Ranker
+
+from app.config import settings
+from app.core.embeddings import get_embeddings
+from app.core.model_server import ModelServer
+
+
+def setup_logging(log_level: str) -> None:
+    """Configure logging for the model server."""
+    logging.basicConfig(
+        level=getattr(logging, log_level.upper()),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+
+
+def main() -> int:
+    """Main entry point for the model server."""
+    parser = argparse.ArgumentParser(
+        description="Load the embedding model and reranker once and serve them to every "
+        "API worker over a Unix socket (set MODEL_SERVER_SOCKET for the API).",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python scripts/model_server.py --socket ./data/model_server.sock
+  python scripts/model_server.py --max-batch 128 --max-wait-ms 10
+        """,
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=settings.model_server_socket or "./data/model_server.sock",
+        help="Unix socket path (default: MODEL_SERVER_SOCKET or ./data/model_server.sock)",
+    )
+    parser.add_argument(
+        "--max-batch",
+        type=int,
+        default=settings.model_server_max_batch,
+        help=f"Texts per embedding forward pass (default: {settings.model_server_max_batch})",
+    )
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=settings.model_server_max_wait_ms,
+        help="How long to hold a request for others to batch with "
+        f"(default: {settings.model_server_max_wait_ms})",
+    )
+    parser.add_argument(
+        "--log-level",
+        type=str,
+        default=settings.log_level,
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help=f"Logging level (default: {settings.log_level})",
+    )
+
+    args = parser.parse_args()
+
+    setup_logging(args.log_level)
+    logger = logging.getLogger(__name__)
+
+    embeddings = get_embeddings()
+    reranker = Ranker(model_name=settings.rerank_model, max_length=settings.rerank_max_length)
+    logger.info(f"Loaded reranker: {settings.rerank_model} (max_length={settings.rerank_max_length})")
+
+    server = ModelServer(
+        socket_path=Path(args.socket),
+        embeddings=embeddings,
+        reranker=reranker,
+        max_batch=args.max_batch,
+        max_wait_ms=args.max_wait_ms,
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info(f"Model server stopped: {dict(server.stats)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+from app.core.declarations import DeclarationChunker
+
+JAVA_SOURCE = """\
+package a;
+
+import b;
+import static c.D.e;
+
+public class Payment {
+    private final long amount;
+
+    public long amount() {
+        return amount;
+    }
+}
+"""
+
+
+def test_package_and_import_lines_are_not_symbols():
+    chunker = DeclarationChunker(chunk_size=40, fallback_split=lambda text: [text], kotlin=False)
+    symbols = {symbol for chunk in chunker.chunk(JAVA_SOURCE) for symbol in chunk.symbols}
+    assert {"a", "b", "e"}.isdisjoint(symbols)
+    assert "Payment" in symbols
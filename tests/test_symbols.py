@@ -0,0 +1,49 @@
+from app.core.declarations import DeclarationChunker
+from app.core.symbols import SymbolIndex
+
+SOURCE = """\
+class PaymentRepository(private val api: PaymentApi) {
+    fun pay(amount: Long) = api.pay(amount)
+}
+
+class PaymentViewModel(
+    private val paymentRepository: PaymentRepository,
+) : ViewModel() {
+    fun submit() = paymentRepository.pay(100)
+}
+"""
+
+
+def index_source(tmp_path, source):
+    chunker = DeclarationChunker(chunk_size=120, fallback_split=lambda text: [text], kotlin=True)
+    chunks = chunker.chunk(source)
+    index = SymbolIndex(tmp_path / "c.symbols.json")
+    index.add(
+        [f"c{i}" for i in range(len(chunks))],
+        [chunk.text for chunk in chunks],
+        [{"language": "kotlin", "symbols": ",".join(chunk.symbols)} for chunk in chunks],
+    )
+    return index, chunks
+
+
+def test_constructor_parameter_is_not_a_definition(tmp_path):
+    index, chunks = index_source(tmp_path, SOURCE)
+    hits = index.lookup("PaymentRepository")
+    assert [chunks[int(hit[1:])].symbols[0] for hit in hits] == ["PaymentRepository"]
+
+
+def test_exact_case_ranks_first(tmp_path):
+    index = SymbolIndex(tmp_path / "c.symbols.json")
+    index.add(
+        ["lower", "exact"],
+        ["", ""],
+        [
+            {"language": "kotlin", "symbols": "AppModule.paymentRepository"},
+            {"language": "kotlin", "symbols": "PaymentRepository"},
+        ],
+    )
+    assert index.lookup("PaymentRepository") == ["exact", "lower"]
+    assert index.lookup("paymentRepository") == ["lower", "exact"]
+
+    index.remove(["exact"])
+    assert index.lookup("PaymentRepository") == ["lower"]